@@ -0,0 +1,170 @@
+"""Offline benchmark of the bot's command callbacks.
+
+Drives the real cogs through stub ctx/Interaction objects against a temporary SQLite file and reports
+throughput and latency per scenario. No Discord connection or token is needed.
+
+    python -m benchmarks.bench_commands --iterations 2000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import tempfile
+import time
+
+from dbdbot.bot import DBDBot
+from dbdbot.encounters import session_key
+from dbdbot.profile_store import store
+
+_ids = itertools.count(1)
+
+
+# FAKE DISCORD OBJECTS
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+
+class FakeMessage:
+    def __init__(self, content=None, embed=None, view=None):
+        self.id = next(_ids)
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        self.edits.append(kwargs)
+        return self
+
+
+class FakeContext:
+    """Stands in for commands.Context; records everything the command sends."""
+
+    def __init__(self, bot, user_id, channel_id=1, guild_id=1):
+        self.bot = bot
+        self.author = FakeUser(user_id)
+        self.channel = type("FakeChannel", (), {"id": channel_id})()
+        self.guild = type("FakeGuild", (), {"id": guild_id})()
+        self.sent = []
+
+    async def send(self, content=None, *, embed=None, view=None, **kwargs):
+        message = FakeMessage(content, embed, view)
+        self.sent.append(message)
+        return message
+
+
+class FakeResponse:
+    def __init__(self):
+        self.calls = []
+
+    async def edit_message(self, **kwargs):
+        self.calls.append(("edit_message", kwargs))
+
+    async def send_message(self, content=None, **kwargs):
+        self.calls.append(("send_message", content, kwargs))
+
+
+class FakeInteraction:
+    """Stands in for discord.Interaction on a button press."""
+
+    def __init__(self, user_id, message, channel_id=1, guild_id=1):
+        self.user = FakeUser(user_id)
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message = message
+        self.response = FakeResponse()
+
+
+# SCENARIOS
+async def invoke(bot, name, ctx, *args, **kwargs):
+    command = bot.get_command(name)
+    await command.callback(command.cog, ctx, *args, **kwargs)
+
+
+def scenarios(bot, users):
+    """Returns {name: coroutine function(i)} for every benchmarked path."""
+    def ctx(i):
+        return FakeContext(bot, users[i % len(users)])
+
+    async def fight(i):
+        context = ctx(i)
+        session = bot.get_cog("Encounters").sessions.start(session_key(1, 1, context.author.id), "Wyrm")
+        session.engaged = True
+        await invoke(bot, "fight", context, dice="1d20")
+
+    async def create(i):
+        await invoke(bot, "createprofile", ctx(i), f"Bench{i}", "Survivor")
+
+    async def profile_buttons(i):
+        context = ctx(i)
+        await invoke(bot, "profile", context, "Muse")
+        message = context.sent[-1]
+        for button in message.view.children:
+            await button.callback(FakeInteraction(context.author.id, message))
+
+    return {
+        "roll 1d20": lambda i: invoke(bot, "roll", ctx(i), dice="1d20"),
+        "roll 4d6kh3+2": lambda i: invoke(bot, "roll", ctx(i), dice="4d6kh3+2"),
+        "fight": fight,
+        "encounter": lambda i: invoke(bot, "encounter", ctx(i)),
+        "hunting": lambda i: invoke(bot, "hunting", ctx(i)),
+        "scavenging": lambda i: invoke(bot, "scavenging", ctx(i)),
+        "fishing": lambda i: invoke(bot, "fishing", ctx(i)),
+        "foraging": lambda i: invoke(bot, "foraging", ctx(i)),
+        "foglocation": lambda i: invoke(bot, "foglocation", ctx(i)),
+        "createprofile": create,
+        "list": lambda i: invoke(bot, "list", ctx(i)),
+        "profile": lambda i: invoke(bot, "profile", ctx(i), "Muse"),
+        "additem": lambda i: invoke(bot, "additem", ctx(i), "Muse", item=f"item {i % 50}"),
+        "removeitem": lambda i: invoke(bot, "removeitem", ctx(i), "Muse", item=f"item {i % 50}"),
+        "updatestats": lambda i: invoke(bot, "updatestats", ctx(i), "Muse", stats=f"Hunting {i}, Fishing 2"),
+        "profile + buttons": profile_buttons,
+    }
+
+
+async def run(iterations, users, only):
+    directory = tempfile.mkdtemp()
+    store.path = os.path.join(directory, "bench.db")
+    bot = DBDBot(extensions=["dbdbot.cogs.profiles", "dbdbot.cogs.games", "dbdbot.cogs.activities",
+                             "dbdbot.cogs.encounters"])
+    await bot._async_setup_hook()  # What login() does before setup_hook; closing a sharded bot depends on it
+    await bot.setup_hook()
+    user_ids = list(range(1000, 1000 + users))
+    try:
+        for user_id in user_ids:
+            await store.create_profile(user_id, "Muse", "Survivor")
+        await store.flush()
+
+        print(f"{'scenario':<20} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, scenario in scenarios(bot, user_ids).items():
+            if only and name not in only:
+                continue
+            latencies = []
+            start = time.perf_counter()
+            for i in range(iterations):
+                began = time.perf_counter()
+                await scenario(i)
+                latencies.append(time.perf_counter() - began)
+            await store.flush()  # Writes are only done once they're committed
+            elapsed = time.perf_counter() - start
+            p50, p95, p99 = (statistics.quantiles(latencies, n=100)[q - 1] * 1000 for q in (50, 95, 99))
+            print(f"{name:<20} {iterations / elapsed:>10.0f} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f}")
+    finally:
+        await bot.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000, help="calls per scenario")
+    parser.add_argument("--users", type=int, default=100, help="distinct users (and profiles) to spread calls over")
+    parser.add_argument("scenario", nargs="*", help="only run these scenarios")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.users, set(args.scenario)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Checks that no profile command makes SQLite scan a whole table.
+
+Fills a temporary database with --profiles muses (stats and items included), drives every ProfileStore
+profile method against it, then runs EXPLAIN QUERY PLAN on each statement they issued. Exits with status 1
+if any plan contains a SCAN.
+
+    python -m benchmarks.query_plans --profiles 100000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from dbdbot.metrics import registry
+from dbdbot.profile_store import DEFAULT_STATS, ProfileStore
+
+# Run by ON DELETE CASCADE when a profile is deleted or replaced; EXPLAIN QUERY PLAN doesn't show those
+CASCADES = (
+    "DELETE FROM profile_stats WHERE user_id = ? AND name = ? AND role = ?",
+    "DELETE FROM inventory_items WHERE user_id = ? AND name = ? AND role = ?",
+    "DELETE FROM active_muses WHERE user_id = ? AND name = ? AND role = ?",
+    "DELETE FROM leaderboard_scores WHERE user_id = ? AND name = ? AND role = ?",
+)
+
+
+def populate(path, profiles):
+    db = sqlite3.connect(path)
+    with db:
+        db.executemany("INSERT INTO profiles (user_id, name, role, guild_id) VALUES (?, ?, ?, ?)",
+                       ((user_id, "Muse", "Survivor", user_id % 100) for user_id in range(profiles)))
+        db.executemany("INSERT INTO profile_stats (user_id, name, role, stat, value) VALUES (?, ?, ?, ?, ?)",
+                       ((user_id, "Muse", "Survivor", stat, user_id % 10)
+                        for user_id in range(profiles) for stat in DEFAULT_STATS))
+        db.executemany("INSERT INTO inventory_items (user_id, name, role, item, count) VALUES (?, ?, ?, ?, ?)",
+                       ((user_id, "Muse", "Survivor", f"item {user_id % 50}", 1) for user_id in range(profiles)))
+        db.executemany("INSERT INTO leaderboard_scores (board, user_id, name, role, guild_id, score) VALUES (?, ?, ?, ?, ?, ?)",
+                       ((board, user_id, "Muse", "Survivor", user_id % 100, user_id % 10)
+                        for user_id in range(profiles) for board in ("hunting", "items")))
+    db.close()
+
+
+async def exercise(store, user_id):
+    """Calls every profile method, cache misses included, so each of their statements is recorded."""
+    await store.create_profile(user_id, "Plan", "Killer")
+    await store.list_profiles(user_id)
+    await store.get_profile(user_id, "Plan")
+    await store.set_stats(user_id, "Plan", {"Hunting": 3})
+    await store.add_item(user_id, "Plan", "rope", 2)
+    await store.remove_item(user_id, "Plan", "rope")
+    await store.remove_item(user_id, "Plan", "rope")
+    await store.profiles_page(user_id)
+    await store.profiles_page(user_id, after=("Plan", "Killer"))
+    await store.inventory_page(user_id, "Plan", "Killer", after="rope")
+    store.clear_caches()  # First pages come from the caches when they can
+    await store.profiles_page(user_id)
+    await store.inventory_page(user_id, "Plan", "Killer")
+    store.claim_guild(user_id, 1)
+    await store.set_active_muse(user_id, "Plan")
+    await store.deposit(user_id, "rope")
+    store._active.clear()
+    await store.get_active_muse(user_id)
+    await store.clear_active_muse(user_id)
+    await store.leaderboard("hunting")
+    await store.leaderboard("items", guild_id=1)
+    await store.flush()
+    await store.delete_profile(user_id, "Plan", "Killer")
+    await store.delete_profile(user_id, "Plan", "Killer")
+
+
+def check(path, statements):
+    db = sqlite3.connect(path)
+    failures = 0
+    for sql in statements:
+        plan = [row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count("?"))]
+        scans = [step for step in plan if step.startswith("SCAN")]
+        failures += bool(scans)
+        print(f"{'FAIL' if scans else 'ok':<5} {sql}")
+        for step in plan:
+            print(f"        {step}")
+    db.close()
+    return failures
+
+
+async def run(profiles):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "plans.db")
+    store = ProfileStore(path)
+    await store.open()  # Creates the schema and indexes
+    await store.close()
+
+    start = time.perf_counter()
+    populate(path, profiles)
+    print(f"Inserted {profiles:,} profiles in {time.perf_counter() - start:.1f}s\n")
+
+    await store.open()
+    registry.reset()
+    try:
+        await exercise(store, profiles + 1)
+    finally:
+        await store.close()
+
+    statements = [sql for sql in registry.queries if sql != "COMMIT"] + list(CASCADES)
+    failures = check(path, statements)
+    print(f"\n{len(statements) - failures}/{len(statements)} statements use an index")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100_000, help="profiles in the test database")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(run(args.profiles)) else 0)
+
+
+if __name__ == "__main__":
+    main()
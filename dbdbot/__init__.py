@@ -0,0 +1 @@
+"""Dead by Daylight roleplay bot: muse profiles, activities, dice and beast encounters."""
@@ -0,0 +1,256 @@
+"""Online backups and JSONL export/import of the profile database.
+
+The backup and export functions open their own sqlite3 connection and block, so the bot runs them with
+asyncio.to_thread and keeps serving commands meanwhile. The bot imports with import_into_store, which commits
+through the ProfileStore and so through the writer process when there is one. All three can also be run
+against a database directly, while the bot is stopped in the case of an import:
+
+    python -m dbdbot.backup backup profiles.db backups/profiles.db
+    python -m dbdbot.backup export profiles.db profiles.jsonl
+    python -m dbdbot.backup import profiles.db profiles.jsonl
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+
+from .profile_store import ITEMS_BOARD, PRAGMAS, REJECTED, ProfileStore
+
+logger = logging.getLogger(__name__)
+
+# Pages copied per backup step, and the pause between steps that lets writers in
+BACKUP_PAGES = 256
+BACKUP_SLEEP = 0.005
+
+# Profiles written per transaction when importing
+IMPORT_BATCH = 500
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    for pragma in PRAGMAS:
+        db.execute(pragma)
+    return db
+
+
+# BACKUP
+def backup(path, destination, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP):
+    """Copies the live database to destination with SQLite's online backup API, a few pages at a time."""
+    source = connect(path)
+    target = sqlite3.connect(destination)
+    try:
+        source.backup(target, pages=pages, sleep=sleep)
+    finally:
+        target.close()
+        source.close()
+
+
+# EXPORT
+def _grouped(cursor):
+    """Yields ((user_id, name, role), {key: value}) from rows ordered by profile."""
+    for key, rows in itertools.groupby(cursor, key=lambda row: row[:3]):
+        yield key, {row[3]: row[4] for row in rows}
+
+
+def iter_profiles(db):
+    """Yields every profile as a dict with its stats and inventory.
+
+    The profile, stat and item tables are read in key order side by side, so memory use doesn't grow with
+    the number of profiles. Run inside a transaction to read one consistent snapshot.
+    """
+    stats = _grouped(db.execute("""
+        SELECT user_id, name, role, stat, value FROM profile_stats ORDER BY user_id, name, role, rowid
+    """))
+    items = _grouped(db.execute("""
+        SELECT user_id, name, role, item, count FROM inventory_items ORDER BY user_id, name, role, rowid
+    """))
+    next_stats = next(stats, None)
+    next_items = next(items, None)
+    for user_id, name, role, guild_id in db.execute("""
+        SELECT user_id, name, role, guild_id FROM profiles ORDER BY user_id, name, role
+    """):
+        key = (user_id, name, role)
+        while next_stats and next_stats[0] < key:
+            next_stats = next(stats, None)
+        while next_items and next_items[0] < key:
+            next_items = next(items, None)
+        yield {
+            "user_id": user_id,
+            "name": name,
+            "role": role,
+            "guild_id": guild_id,
+            "stats": next_stats[1] if next_stats and next_stats[0] == key else {},
+            "inventory": next_items[1] if next_items and next_items[0] == key else {},
+        }
+
+
+def export_profiles(path, destination):
+    """Writes every profile to destination as JSON lines. Returns how many were written."""
+    db = connect(path)
+    count = 0
+    try:
+        db.execute("BEGIN")  # One snapshot for all three tables
+        with open(destination, "w", encoding="utf-8") as f:
+            for profile in iter_profiles(db):
+                f.write(json.dumps(profile, ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        db.rollback()
+        db.close()
+    return count
+
+
+# IMPORT
+def read_profiles(source):
+    """Yields (line number, profile dict) from a JSONL export; the profile is None for lines that aren't one."""
+    with open(source, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                profile = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping line {number} of {source}: {e}")
+                yield number, None
+                continue
+            if not isinstance(profile, dict) or not all(key in profile for key in ("user_id", "name", "role")):
+                logger.error(f"Skipping line {number} of {source}: not a profile")
+                yield number, None
+                continue
+            yield number, profile
+
+
+def profile_statements(profile):
+    """Returns the [(sql, params, many)] that restore the profile. Raises ValueError, TypeError or
+    AttributeError if its stats or inventory aren't what an export contains.
+    """
+    key = (profile["user_id"], profile["name"], profile["role"])
+    if not isinstance(key[0], int):
+        raise TypeError(f"user_id must be an integer, not {key[0]!r}")
+    stats = profile.get("stats") or {}
+    inventory = profile.get("inventory") or {}
+    scores = {stat.lower(): int(value) for stat, value in stats.items()}
+    scores[ITEMS_BOARD] = sum(int(count) for count in inventory.values() if int(count) > 0)
+    return [
+        # Replacing the profile cascades to its old stats, items and scores
+        ("INSERT OR REPLACE INTO profiles (user_id, name, role, guild_id) VALUES (?, ?, ?, ?)",
+         (*key, profile.get("guild_id")), False),
+        ("INSERT INTO profile_stats (user_id, name, role, stat, value) VALUES (?, ?, ?, ?, ?)",
+         [(*key, stat, int(value)) for stat, value in stats.items()], True),
+        ("INSERT INTO inventory_items (user_id, name, role, item, count) VALUES (?, ?, ?, ?, ?)",
+         [(*key, item, int(count)) for item, count in inventory.items() if int(count) > 0], True),
+        ("""
+            INSERT OR REPLACE INTO leaderboard_scores (board, user_id, name, role, guild_id, score)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(board, *key, profile.get("guild_id"), score) for board, score in scores.items() if score], True),
+    ]
+
+
+def _write_profile(db, profile):
+    for sql, params, many in profile_statements(profile):
+        if many:
+            db.executemany(sql, params)
+        else:
+            db.execute(sql, params)
+
+
+def import_profiles(path, source, batch=IMPORT_BATCH):
+    """Restores profiles from a JSONL export, replacing profiles with the same key.
+
+    Commits every `batch` profiles so the bot's own writes aren't held up for the whole import.
+    Returns (profiles imported, lines skipped).
+    """
+    db = connect(path)
+    imported = skipped = 0
+    try:
+        for chunk in _batched(read_profiles(source), batch):
+            with db:
+                for number, profile in chunk:
+                    if profile is None:
+                        skipped += 1
+                        continue
+                    try:
+                        _write_profile(db, profile)
+                        imported += 1
+                    except (sqlite3.Error, ValueError, TypeError, AttributeError) as e:
+                        logger.error(f"Skipping line {number} of {source}: {e}")
+                        skipped += 1
+    finally:
+        db.close()
+    return imported, skipped
+
+
+async def import_into_store(store, source, batch=IMPORT_BATCH):
+    """Like import_profiles, but commits each batch with store.write().
+
+    Under the supervisor that sends the import to the writer process, which tells every other worker to drop
+    the imported users' cached profiles. The file is still read in a worker thread.
+    """
+    imported = skipped = 0
+    chunks = _batched(read_profiles(source), batch)
+    while chunk := await asyncio.to_thread(next, chunks, ()):
+        profiles = []  # [(line number, user id, statements)]
+        for number, profile in chunk:
+            if profile is None:
+                skipped += 1
+                continue
+            try:
+                profiles.append((number, profile["user_id"], profile_statements(profile)))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Skipping line {number} of {source}: {e}")
+                skipped += 1
+        if not profiles:
+            continue
+        try:
+            await store.write([statement for _, _, statements in profiles for statement in statements],
+                              users={user_id for _, user_id, _ in profiles})
+        except REJECTED as e:
+            logger.error(f"Error importing lines {chunk[0][0]}-{chunk[-1][0]} of {source}, retrying one by one: {e}")
+        else:
+            imported += len(profiles)
+            continue
+        for number, user_id, statements in profiles:
+            try:
+                await store.write(statements, users=(user_id,))
+                imported += 1
+            except REJECTED as e:
+                logger.error(f"Skipping line {number} of {source}: {e}")
+                skipped += 1
+    return imported, skipped
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while chunk := tuple(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def _create_schema(path):
+    store = ProfileStore(path)
+    await store.open()
+    await store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("backup", "export", "import"))
+    parser.add_argument("database", help="profile database, e.g. profiles.db")
+    parser.add_argument("file", help="backup file to write, or JSONL file to export to or import from")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.action == "backup":
+        backup(args.database, args.file)
+        print(f"Backed up {args.database} to {args.file}")
+    elif args.action == "export":
+        print(f"Exported {export_profiles(args.database, args.file)} profiles to {args.file}")
+    else:
+        asyncio.run(_create_schema(args.database))
+        imported, skipped = import_profiles(args.database, args.file)
+        print(f"Imported {imported} profiles from {args.file}, skipped {skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import math
+import os
+import time
+
+import discord
+from discord.ext import commands
+
+from .cooldowns import Cooldowns, OnCooldown, limits_from_env
+from .metrics import registry
+from .outbound import DBDContext, SendQueue
+from .profile_store import store
+from .writer import WriterClient
+
+logger = logging.getLogger(__name__)
+
+# How often a supervised worker checks that its supervisor is still running
+SUPERVISOR_CHECK_INTERVAL = 5.0
+
+# Features loaded at startup; set DBDBOT_EXTENSIONS (e.g. "profiles,games") to enable only some of them
+EXTENSIONS = ("general", "profiles", "games", "activities", "encounters", "metrics", "admin")
+
+
+def enabled_extensions():
+    names = os.getenv("DBDBOT_EXTENSIONS")
+    names = [name.strip() for name in names.split(",") if name.strip()] if names else EXTENSIONS
+    return [f"{__package__}.cogs.{name}" for name in names]
+
+
+def parse_shard_ids(value):
+    """Parses shard ids like "0-3,8" into [0, 1, 2, 3, 8]."""
+    shard_ids = []
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        shard_ids.extend(range(int(first), int(last or first) + 1))
+    return shard_ids
+
+
+def shard_config():
+    """Returns (shard_ids, shard_count) from DBDBOT_SHARD_IDS and DBDBOT_SHARD_COUNT.
+
+    Both unset runs every shard Discord recommends in this process. The supervisor sets them for each worker.
+    """
+    shard_ids = os.getenv("DBDBOT_SHARD_IDS")
+    shard_count = os.getenv("DBDBOT_SHARD_COUNT")
+    return (parse_shard_ids(shard_ids) if shard_ids else None), (int(shard_count) if shard_count else None)
+
+
+class DBDBot(commands.AutoShardedBot):
+    def __init__(self, extensions=None):
+        # Enable necessary intents. Prefix commands need message content; a bot used only through slash
+        # commands can set DBDBOT_MESSAGE_CONTENT=0 and stop receiving every message's content
+        intents = discord.Intents.default()
+        intents.message_content = os.getenv("DBDBOT_MESSAGE_CONTENT", "1") != "0"
+
+        # Set command prefix. Long rate limit waits raise instead, so the send queue can pause every send
+        shard_ids, shard_count = shard_config()
+        super().__init__(command_prefix="!", intents=intents, max_ratelimit_timeout=10.0,
+                         shard_ids=shard_ids, shard_count=shard_count)
+        self.initial_extensions = enabled_extensions() if extensions is None else extensions
+        self.cooldowns = Cooldowns(limits_from_env())
+        self.send_queue = SendQueue()
+        self.add_check(self.check_cooldown)
+
+    async def setup_hook(self):
+        # The store is opened by the cogs that use it, so a bot without them never touches the database
+        writer = os.getenv("DBDBOT_WRITER")
+        if writer:
+            # Run by dbdbot.supervisor, which commits every worker's profile writes. Connects on the first write
+            store.writer = WriterClient(writer, store.forget_users, store.clear_caches)
+            self._supervisor_watch = asyncio.create_task(self._watch_supervisor(os.getppid()))
+        for extension in self.initial_extensions:
+            await self.load_extension(extension)
+
+    async def _watch_supervisor(self, supervisor_pid):
+        """Shuts a worker down once its supervisor is gone; a restarted supervisor starts its own workers for
+        the same shards, and the two mustn't both run.
+        """
+        while os.getppid() == supervisor_pid:
+            await asyncio.sleep(SUPERVISOR_CHECK_INTERVAL)
+        logger.error("Supervisor exited; shutting down")
+        await self.close()
+
+    def owns_guild(self, guild_id):
+        """Whether the guild's events (0 for DMs) come to this process's shards."""
+        if self.shard_ids is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    async def get_context(self, origin, /, *, cls=DBDContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def invoke(self, ctx):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        # Time every command, including its checks and error handling
+        start = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            await self._flush(ctx)
+            registry.observe_command(ctx.command.qualified_name, time.perf_counter() - start, ctx.command_failed)
+
+    async def _flush(self, ctx):
+        """Sends the text a command's replies held back."""
+        if isinstance(ctx, DBDContext):
+            try:
+                await ctx.flush()
+            except discord.HTTPException as e:
+                logger.error(f"Failed to send the reply to {ctx.command}: {e}")
+
+    async def check_cooldown(self, ctx):
+        retry_after, notify = self.cooldowns.hit(ctx.author.id, ctx.command.qualified_name)
+        if retry_after:
+            raise OnCooldown(retry_after, notify)
+        return True
+
+    # Slash invocations of hybrid commands don't go through invoke(), so they're timed from these events
+    async def on_command(self, ctx):
+        if ctx.interaction is not None:
+            ctx.started_at = time.perf_counter()
+
+    async def on_command_completion(self, ctx):
+        if ctx.interaction is not None:
+            await self._flush(ctx)
+        self._observe_interaction(ctx)
+
+    async def on_command_error(self, ctx, error):
+        if ctx.interaction is not None:
+            await self._flush(ctx)
+        self._observe_interaction(ctx)
+        if isinstance(error, OnCooldown):
+            # Tell a spamming user once rather than answering every attempt; slash commands always need a reply
+            if error.notify or ctx.interaction is not None:
+                await ctx.send(f"⏳ ┃ Slow down! You can use `{ctx.command.qualified_name}` again in "
+                               f"**{math.ceil(error.retry_after)}s**.", ephemeral=True)
+            return
+        await super().on_command_error(ctx, error)
+
+    def _observe_interaction(self, ctx):
+        started_at = getattr(ctx, "started_at", None)
+        if ctx.interaction is not None and started_at is not None:
+            registry.observe_command(ctx.command.qualified_name, time.perf_counter() - started_at, ctx.command_failed)
+
+    async def on_ready(self):
+        logger.info(f"✅ Logged in as {self.user}")
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            await store.close()  # Write queued profile changes and close pooled connections
+
+
+def load_token():
+    """Returns DISCORD_BOT_TOKEN, or None (logging why) if it isn't usable."""
+    token = os.getenv("DISCORD_BOT_TOKEN")
+    if not token:
+        logger.error("Error: DISCORD_BOT_TOKEN environment variable not set.")
+        return None
+    if "\n" in token or "\r" in token:
+        logger.error("Error: DISCORD_BOT_TOKEN contains invalid characters.")
+        return None
+    return token
+
+
+# Run the bot with proper initialization
+async def start():
+    token = load_token()
+    if not token:
+        return
+    bot = DBDBot()
+    try:
+        await bot.start(token)
+    finally:
+        await bot.close()
+
+
+def main():
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(start())
+    except KeyboardInterrupt:
+        logger.info("Bot shut down manually.")
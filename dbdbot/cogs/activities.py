@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from collections import Counter
+
+import discord
+from discord.ext import commands
+
+from .. import loot
+from ..profile_store import store
+from .profiles import clip
+
+logger = logging.getLogger(__name__)
+
+# Most draws one activity command can make; keeps the summary inside one embed
+MAX_DRAWS = 50
+Trips = commands.Range[int, 1, MAX_DRAWS]
+
+
+class Activities(commands.Cog):
+    """Hunting, scavenging, fishing, foraging and fog travel."""
+
+    help_section = "🩸 ┃ Activity Commands"  # Where !cmds lists these commands
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await asyncio.to_thread(loot.load_tables)  # Fail fast on a broken data file
+        await store.open()
+
+    async def cog_before_invoke(self, ctx):
+        if ctx.guild:
+            store.claim_guild(ctx.author.id, ctx.guild.id)  # See Profiles.cog_before_invoke
+
+    async def cog_command_error(self, ctx, error):
+        if isinstance(error, commands.BadArgument):
+            await ctx.send(f"❌ ┃ You can go on 1 to {MAX_DRAWS} trips at once.")
+        elif isinstance(error, commands.CheckFailure):
+            return  # Cooldowns are answered by the bot's on_command_error; spam must not flood the log
+        else:
+            # Having a cog error handler stops the bot from logging the error itself
+            logger.error(f"Error in command {ctx.command}", exc_info=error)
+
+    async def deposit(self, ctx, outcome):
+        """Credits the outcome to the user's active muse. Returns the note to add to the reply."""
+        muse = await store.deposit(ctx.author.id, outcome)
+        return f" Added to **{muse}**'s inventory." if muse else ""
+
+    async def expedition(self, ctx, table, times, title, deposit=True):
+        """Draws `times` outcomes at once and replies with one counted summary, depositing them all in one write."""
+        counts = Counter(loot.table(table).draw_many(times))
+        lines = [f"**{clip(outcome)}** x{count}" if count > 1 else f"**{clip(outcome)}**"
+                 for outcome, count in sorted(counts.items(), key=lambda entry: (-entry[1], entry[0]))]
+        embed = discord.Embed(title=f"{title} ┃ {times} trips", description="\n".join(lines), color=0x000000)
+        muse = await store.deposit_many(ctx.author.id, counts) if deposit else None
+        if muse:
+            embed.set_footer(text=f"Everything was added to {muse}'s inventory.")
+        await ctx.send(embed=embed)
+
+    # HUNTING, SAV. ETC.
+    # Outcome tables live in data/loot_tables.toml. Each command takes an optional number of trips to make.
+    @commands.hybrid_command(name="hunting", usage="[times]", brief="Go hunting")
+    async def hunting(self, ctx, times: Trips = 1):
+        """Simulates a hunting activity and returns a random outcome."""
+        if times > 1:
+            await self.expedition(ctx, "hunting", times, "🏹 Hunting")
+            return
+        outcome = loot.table("hunting").draw()
+        note = await self.deposit(ctx, outcome)
+        await ctx.send(f"🏹 ┃ You found a **{outcome}**.{note}")
+
+    @commands.hybrid_command(name="scavenging", usage="[times]", brief="Go scavenging")
+    async def scavenging(self, ctx, times: Trips = 1):
+        """Simulates a scavenging activity and returns a random outcome."""
+        if times > 1:
+            await self.expedition(ctx, "scavenging", times, "🔍 Scavenging")
+            return
+        outcome = loot.table("scavenging").draw()
+        note = await self.deposit(ctx, outcome)
+        await ctx.send(f"🔍 ┃ You found a **{outcome}**.{note}")
+
+    @commands.hybrid_command(name="fishing", usage="[times]", brief="Go fishing")
+    async def fishing(self, ctx, times: Trips = 1):
+        """Simulates a fishing activity and returns a random outcome."""
+        if times > 1:
+            await self.expedition(ctx, "fishing", times, "🎣 Fishing")
+            return
+        outcome = loot.table("fishing").draw()
+        note = await self.deposit(ctx, outcome)
+        await ctx.send(f"🎣 ┃ You caught a **{outcome}**.{note}")
+
+    @commands.hybrid_command(name="foraging", usage="[times]", brief="Go foraging")
+    async def foraging(self, ctx, times: Trips = 1):
+        """Simulates a foraging activity and returns a random outcome."""
+        if times > 1:
+            await self.expedition(ctx, "foraging", times, "🌿 Foraging")
+            return
+        outcome = loot.table("foraging").draw()
+        note = await self.deposit(ctx, outcome)
+        await ctx.send(f"🌿 ┃ You found a **{outcome}**.{note}")
+
+    @commands.hybrid_command(name="foglocation", usage="[times]", brief="Travel to a random location")
+    async def foglocation(self, ctx, times: Trips = 1):
+        """Simulates walking around in the fog and returns a random location."""
+        if times > 1:
+            await self.expedition(ctx, "locations", times, "🌫️ The Fog", deposit=False)
+            return
+        location = loot.table("locations").draw()
+        await ctx.send(f"🌫️ ┃ The fog sends you to **{location}**.")
+
+    @commands.command(name="reloadloot", hidden=True)
+    @commands.is_owner()
+    async def reload_loot(self, ctx):
+        """Reloads the loot tables from their data file without restarting the bot.
+
+        Under dbdbot.supervisor this only reloads the worker that received the command; restart the
+        supervisor to reload every worker.
+        """
+        try:
+            version = await asyncio.to_thread(loot.load_tables)
+        except Exception as e:
+            logger.error(f"Failed to reload loot tables: {e}")
+            await ctx.send(f"❌ ┃ Loot tables were not reloaded: {e}")
+            return
+        note = " Only this worker process was reloaded." if store.writer is not None else ""
+        await ctx.send(f"✅ ┃ Loot tables reloaded (v{version}).{note}")
+
+
+async def setup(bot):
+    await bot.add_cog(Activities(bot))
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import time
+
+from discord.ext import commands
+
+from .. import backup
+from ..profile_store import store
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = "backups"
+
+
+def backup_path(kind, extension):
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    return os.path.join(BACKUP_DIR, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+
+class Admin(commands.Cog):
+    """Owner commands for backing up and restoring the profile database.
+
+    Backups and exports run in a worker thread on their own connection, so other commands keep being served
+    meanwhile. Imports are committed through the store in batches.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await store.open()
+
+    @commands.command(name="backup", hidden=True)
+    @commands.is_owner()
+    async def backup_database(self, ctx):
+        """Copies the profile database to the backups folder while the bot keeps running."""
+        await store.flush()  # Include changes still in the write queue
+        destination = backup_path("profiles", "db")
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(backup.backup, store.path, destination)
+        except Exception as e:
+            logger.error(f"Backup to {destination} failed: {e}")
+            await ctx.send(f"❌ ┃ Backup failed: {e}")
+            return
+        await ctx.send(f"✅ ┃ Backed up to `{destination}` in {time.perf_counter() - start:.1f}s.")
+
+    @commands.command(name="export", hidden=True)
+    @commands.is_owner()
+    async def export_profiles(self, ctx):
+        """Writes every profile and inventory to a JSON lines file in the backups folder."""
+        await store.flush()
+        destination = backup_path("profiles", "jsonl")
+        try:
+            count = await asyncio.to_thread(backup.export_profiles, store.path, destination)
+        except Exception as e:
+            logger.error(f"Export to {destination} failed: {e}")
+            await ctx.send(f"❌ ┃ Export failed: {e}")
+            return
+        await ctx.send(f"✅ ┃ Exported {count} profiles to `{destination}`.")
+
+    @commands.command(name="import", hidden=True)
+    @commands.is_owner()
+    async def import_profiles(self, ctx, path: str):
+        """Restores profiles from a JSON lines export, replacing profiles with the same name."""
+        if not os.path.isfile(path):
+            await ctx.send(f"❌ ┃ There's no file at `{path}`.")
+            return
+        await store.flush()  # Queued writes would otherwise land on top of the imported profiles
+        try:
+            # Through the store, so a supervised worker sends it to the writer like any other write
+            imported, skipped = await backup.import_into_store(store, path)
+        except Exception as e:
+            logger.error(f"Import from {path} failed: {e}")
+            await ctx.send(f"❌ ┃ Import failed: {e}")
+            return
+        finally:
+            store.clear_caches()
+        note = f" Skipped {skipped} lines that couldn't be read; see the log." if skipped else ""
+        await ctx.send(f"✅ ┃ Imported {imported} profiles from `{path}`.{note}")
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -0,0 +1,154 @@
+import functools
+import random
+
+import discord
+from discord.ext import commands
+
+from .. import loot
+from ..dice import DiceError, compile_expression
+from ..encounters import (BEAST_FLED, INJURED, SURVIVAL_THRESHOLD, WON, EncounterStore, resolve_round,
+                          session_key)
+from ..profile_store import store
+
+
+def context_key(ctx):
+    return session_key(ctx.guild.id if ctx.guild else None, ctx.channel.id, ctx.author.id)
+
+
+def interaction_key(interaction):
+    return session_key(interaction.guild_id, interaction.channel_id, interaction.user.id)
+
+
+# Embeds aren't modified by sending them, so these are built once and shared, like the other cogs' cached embeds
+@functools.lru_cache(maxsize=64)
+def encounter_embed(beast):
+    return discord.Embed(title="Beast Encounter", description=f"You encountered a **{beast}**!", color=0x7d2122)
+
+
+@functools.cache
+def injured_embed():
+    return discord.Embed(title="Beast Encounter", description=f"You've been injured! Do you want to **fight** on or **flee**?\n *Continuing to fight may lead to your muse’s death*.", color=0x7d2122)
+
+
+class EncounterView(discord.ui.View):
+    """Fight/Flee buttons for a new encounter. Persistent, so the buttons keep working after a restart."""
+
+    def __init__(self, sessions):
+        super().__init__(timeout=None)
+        self.sessions = sessions
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        session = self.sessions.get(interaction_key(interaction))
+        if not session or session.message_id != interaction.message.id:
+            await interaction.response.send_message("❌ ┃ This isn't your encounter, or it has already ended.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Flee", style=discord.ButtonStyle.secondary, custom_id="encounter:flee")
+    async def flee(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message("You fled safely.")
+        self.sessions.end(interaction_key(interaction))
+
+    @discord.ui.button(label="Fight", style=discord.ButtonStyle.danger, custom_id="encounter:fight")
+    async def fight(self, interaction: discord.Interaction, button: discord.ui.Button):
+        key = interaction_key(interaction)
+        session = self.sessions.get(key)
+        session.engaged = True
+        self.sessions.update(key)
+        await interaction.response.send_message(f"You chose to fight the **{session.beast}**! \nUse the command `!fight` to roll a die.")
+
+
+class SecondEncounterView(EncounterView):
+    """Fight on/Flee buttons shown after the first injury."""
+
+    @discord.ui.button(label="Flee", style=discord.ButtonStyle.secondary, custom_id="encounter:flee_injured")
+    async def flee(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message("You managed to flee, but suffered injuries in the process.")
+        self.sessions.end(interaction_key(interaction))
+
+    @discord.ui.button(label="Fight", style=discord.ButtonStyle.danger, custom_id="encounter:fight_on")
+    async def fight(self, interaction: discord.Interaction, button: discord.ui.Button):
+        session = self.sessions.get(interaction_key(interaction))
+        await interaction.response.send_message(f"You chose to continue fighting the **{session.beast}**! \nUse the command `!fight` to roll a die.")
+
+
+class Encounters(commands.Cog):
+    """Beast encounters and the fights that follow them."""
+
+    help_section = "🔪 ┃ Game Commands"  # Where !cmds lists these commands
+
+    def __init__(self, bot):
+        self.bot = bot
+        # Each player's fight is tracked separately per channel
+        self.sessions = EncounterStore()
+
+    async def cog_load(self):
+        await store.open()
+        await self.sessions.open(store, owns_guild=self.bot.owns_guild)  # Resume fights from before a restart
+        self.bot.add_view(EncounterView(self.sessions))
+        self.bot.add_view(SecondEncounterView(self.sessions))
+        # Sent with each encounter message only to draw its buttons. discord.py doesn't keep views that are
+        # already stopped, so clicks go to the persistent views above and nothing piles up per message
+        self.encounter_buttons = EncounterView(self.sessions)
+        self.encounter_buttons.stop()
+        self.injured_buttons = SecondEncounterView(self.sessions)
+        self.injured_buttons.stop()
+
+    async def cog_unload(self):
+        await self.sessions.close()  # Write pending encounter changes
+
+    @commands.hybrid_command(name="encounter", brief="Start a beast encounter")
+    async def encounter(self, ctx):
+        """Simulates a Beast Encounter and returns the result."""
+        encounter_result = loot.table("encounters").draw()
+        if encounter_result == "nothing":
+            await ctx.send("You encountered nothing.")
+        else:
+            key = context_key(ctx)
+            session = self.sessions.start(key, encounter_result)
+            message = await ctx.send(embed=encounter_embed(encounter_result), view=self.encounter_buttons)
+            session.message_id = message.id
+            self.sessions.update(key)
+
+    @commands.hybrid_command(name="fight", usage="", brief="Roll to fight in an encounter")
+    async def fight(self, ctx, *, dice: str = "1d20"):
+        """Rolls a dice expression; a plain 1d20 resolves the current encounter."""
+        key = context_key(ctx)
+        session = self.sessions.get(key)
+        if not session or not session.engaged:
+            await ctx.send('There is no active encounter. \nUse the `!encounter` command to start an encounter.')
+            return
+
+        try:
+            expression = compile_expression(dice)
+        except DiceError as e:
+            await ctx.send(str(e))
+            return
+
+        result = expression.roll()
+        await ctx.send(f'You rolled {result.describe()} ')
+
+        if expression.is_plain(1, 20):
+            beast_roll_value = random.randint(1, 20)
+            survival_threshold = random.randint(*SURVIVAL_THRESHOLD)  # Random threshold to beat
+            outcome, session.failed_attempts = resolve_round(result.total, beast_roll_value, survival_threshold,
+                                                             session.failed_attempts)
+
+            if outcome == BEAST_FLED:
+                await ctx.send(f"The Enemy rolled **{beast_roll_value}** as well.\n\n**The {session.beast} changed its mind and fled!**")
+                self.sessions.end(key)  # Reset encounter
+            elif outcome == WON:
+                await ctx.send(f"The Enemy rolled **{survival_threshold}** \n\n🏆 ┃ **You defeated the {session.beast}!** \n-# You can scavenge once more today. ")
+                self.sessions.end(key)  # Reset encounter
+            elif outcome == INJURED:
+                await ctx.send(f"The Enemy rolled **{survival_threshold}**")
+                message = await ctx.send(embed=injured_embed(), view=self.injured_buttons)
+                session.message_id = message.id
+                self.sessions.update(key)
+            else:
+                await ctx.send(f"The Enemy rolled **{survival_threshold}** \n\n🪦 ┃ **Your muse got killed by the {session.beast}**.")
+                self.sessions.end(key)  # Reset encounter
+
+
+async def setup(bot):
+    await bot.add_cog(Encounters(bot))
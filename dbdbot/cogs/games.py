@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import random
+
+import discord
+from discord.ext import commands
+
+from ..dice import DiceError, compile_expression
+
+FLIP_GIF = "https://media4.giphy.com/media/v1.Y2lkPTc5MGI3NjExMHZ4bGRucng3ZThqdDVlNzM3anU1ZXo2czFhenVrZnMxZWw1NmJxMyZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9cw/MOsuJf3qp3b1fQx2Iv/giphy.gif"  # Coin flip GIF link
+
+
+@functools.cache
+def flip_embed():
+    embed = discord.Embed(title="Flipping the coin...", color=0x000000)
+    embed.set_image(url=FLIP_GIF)
+    return embed
+
+
+class Games(commands.Cog):
+    """Dice, coin flips and random choices."""
+
+    help_section = "🔪 ┃ Game Commands"  # Where !cmds lists these commands
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # D20 SYSTEM
+    @commands.hybrid_command(usage="[dice]", brief="Roll dice like 2d6+3, 4d6kh3 or adv (default: 1d20)")
+    async def roll(self, ctx, *, dice: str = "1d20"):
+        """Rolls a dice expression such as 1d20, 2d6+3, 4d6kh3 or adv and pings the user."""
+        try:
+            expression = compile_expression(dice)
+        except DiceError as e:
+            await ctx.send(str(e))
+            return
+
+        result = expression.roll()
+
+        # Send a normal message with proper formatting
+        await ctx.send(f"🎲 ┃ {ctx.author.mention} rolled {result.describe()}")
+
+    # FLIP COIN
+    @commands.hybrid_command(name="coinflip", brief="Flip a coin")
+    async def coinflip(self, ctx):
+        """Flips a coin, shows a GIF, then reveals the result."""
+        result = random.choice(["🪙 ┃ Heads!", "🪙 ┃ Tails!"])
+
+        # Send the embed with the GIF first
+        gif_message = await ctx.send(embed=flip_embed())
+
+        # Wait 2 seconds, then reveal the result
+        await asyncio.sleep(1)
+        await gif_message.edit(embed=None, content=result)
+
+    # CHOOSE
+    @commands.hybrid_command(name="choose", usage="", brief="Choose between multiple options")
+    async def choose(self, ctx, *, options: str):
+        """Chooses a random option from a comma-separated list."""
+        choices = [choice.strip() for choice in options.split(",")]
+        if not choices:
+            await ctx.send("❌ ┃ Please provide options separated by commas.")
+            return
+        chosen = random.choice(choices)
+        await ctx.send(f"{chosen}")
+
+
+async def setup(bot):
+    await bot.add_cog(Games(bot))
@@ -0,0 +1,64 @@
+import discord
+from discord.ext import commands
+
+DOCS_URL = "https://docs.google.com/document/d/10_BAk4cHfcxKPen8EPnTxq1MyJnlsZN7Z4eHWMgh7NE/edit?usp=sharing"
+
+
+def build_help(bot):
+    """Builds the !cmds embed from the registered commands' usage, brief and hidden metadata.
+
+    Commands are grouped by their cog's help_section, in the order the cogs were loaded and the commands
+    defined.
+    """
+    sections = {}
+    for cog in bot.cogs.values():
+        section = getattr(cog, "help_section", None) or f"{cog.qualified_name} Commands"
+        for command in cog.walk_commands():
+            if command.hidden:
+                continue
+            usage = f"!{command.qualified_name} {command.signature}".strip()
+            sections.setdefault(section, []).append(f"`{usage}` - {command.short_doc}")
+
+    embed = discord.Embed(title="Available Commands", color=0x000000)
+    for section, lines in sections.items():
+        embed.add_field(name=section, value="\n".join(lines), inline=False)
+        embed.add_field(name="‎", value="‎", inline=False)
+    embed.add_field(name="📚 ┃ Documentation", value=f"For more detailed information about commands and troubleshooting, check the [Doc!]({DOCS_URL})", inline=False)
+    return embed
+
+
+class General(commands.Cog):
+    """Help and status commands."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.help_embed = None
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Every extension is loaded by now
+        self.help_embed = build_help(self.bot)
+
+    @commands.command(name="cmds", hidden=True)
+    async def help_command(self, ctx):
+        """Shows all available commands."""
+        if self.help_embed is None:
+            self.help_embed = build_help(self.bot)
+        await ctx.send(embed=self.help_embed)
+
+    @commands.command(name="sync", hidden=True)
+    @commands.is_owner()
+    async def sync(self, ctx):
+        """Registers the slash commands with Discord. Only needed after they change; syncing is rate limited."""
+        synced = await self.bot.tree.sync()
+        await ctx.send(f"✅ ┃ Synced {len(synced)} slash commands.")
+
+    # TEST
+    @commands.command(name="test", hidden=True)
+    async def test(self, ctx):
+        """Tests if the bot is online."""
+        await ctx.send("✅ ┃ I'm online!")
+
+
+async def setup(bot):
+    await bot.add_cog(General(bot))
@@ -0,0 +1,71 @@
+import logging
+import os
+
+import discord
+from aiohttp import web
+from discord.ext import commands
+
+from ..metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Set DBDBOT_METRICS_PORT to serve Prometheus metrics on http://127.0.0.1:<port>/metrics. Under dbdbot.supervisor
+# each worker serves its own, on that port plus the worker's index
+METRICS_PORT_ENV = "DBDBOT_METRICS_PORT"
+
+# Rows shown per table by !stats
+STATS_ROWS = 10
+
+
+def _latency_rows(histograms, key):
+    rows = sorted(histograms.items(), key=lambda item: key(item[1]), reverse=True)[:STATS_ROWS]
+    if not rows:
+        return "No data yet."
+    lines = [f"{'name':<24} {'n':>6} {'err':>4} {'p50':>7} {'p95':>7} {'p99':>7}"]
+    for name, histogram in rows:
+        name = name if len(name) <= 24 else name[:23] + "…"
+        p50, p95, p99 = (histogram.quantile(q) * 1000 for q in (0.5, 0.95, 0.99))
+        lines.append(f"{name:<24} {histogram.count:>6} {histogram.errors:>4} {p50:>7.1f} {p95:>7.1f} {p99:>7.1f}")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+class Metrics(commands.Cog):
+    """Command and database latency statistics."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._runner = None
+
+    async def cog_load(self):
+        port = os.getenv(METRICS_PORT_ENV)
+        if not port:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._serve_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", int(port)).start()
+        logger.info(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+
+    async def cog_unload(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _serve_metrics(self, request):
+        return web.Response(text=registry.prometheus(), content_type="text/plain", charset="utf-8")
+
+    @commands.command(name="stats", hidden=True)
+    @commands.is_owner()
+    async def stats(self, ctx):
+        """Shows latency percentiles (ms) for the busiest commands and slowest SQL statements."""
+        embed = discord.Embed(title="Bot Stats", color=0x000000)
+        embed.add_field(name="Commands (busiest)", value=_latency_rows(registry.commands, lambda h: h.count),
+                        inline=False)
+        embed.add_field(name="SQL (most total time)", value=_latency_rows(registry.queries, lambda h: h.sum),
+                        inline=False)
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
@@ -0,0 +1,337 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from ..profile_store import DEFAULT_STATS, ITEMS_BOARD, store
+
+
+# Rows shown per page, and the longest line, keep every page well inside Discord's embed limits
+PAGE_SIZE = 15
+MAX_LINE = 60
+
+# Longest name or value Discord accepts for an autocomplete choice
+MAX_CHOICE = 100
+
+ROLES = ("Survivor", "Killer")
+
+
+def clip(text, limit=MAX_LINE):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class Pager:
+    """Fetches one page at a time with a keyset query and keeps every page it has rendered.
+
+    fetch(after, limit) returns rows following the cursor `after` (None for the first page),
+    render(rows, page, has_next) turns them into an embed and key(row) is the cursor the next page starts after.
+    """
+
+    def __init__(self, fetch, render, key, size=PAGE_SIZE):
+        self.fetch = fetch
+        self.render = render
+        self.key = key
+        self.size = size
+        self.page = 0
+        self.has_next = False
+        self._starts = [None]  # Cursor each page starts after
+        self._pages = {}  # page -> (embed, has_next)
+
+    async def show(self, page):
+        """Returns the embed for page, fetching and rendering it the first time it's shown."""
+        if page not in self._pages:
+            rows = await self.fetch(self._starts[page], self.size + 1)  # One extra row tells if there's more
+            has_next = len(rows) > self.size
+            rows = rows[:self.size]
+            if has_next and len(self._starts) == page + 1:
+                self._starts.append(self.key(rows[-1]))
+            self._pages[page] = (self.render(rows, page, has_next), has_next)
+        self.page = page
+        embed, self.has_next = self._pages[page]
+        return embed
+
+
+class ProfileView(discord.ui.View):
+    def __init__(self, user_id, profile):
+        super().__init__()
+        self.name = profile.name
+        self.role = profile.role
+        formatted_stats = "\n".join(f"︴{clip(stat)}: {value}" for stat, value in profile.stats.items()) or "Empty"
+        self.main_info = discord.Embed(title=f"{self.name} ({self.role})", color=0x000000)
+        self.main_info.add_field(name="01﹒ Muse Stats", value=formatted_stats, inline=False)
+        self.main_info.add_field(name="", value="", inline=False)  # Smaller empty field
+        self.main_info.set_footer(text="use !cmds for all commands")
+        self.inventory = Pager(
+            lambda after, limit: store.inventory_page(user_id, self.name, self.role, after, limit),
+            self.render_inventory, key=lambda row: row[0],
+        )
+        self.current_display = 'main_info'
+        self.embed = self.main_info
+        self.update_buttons()
+
+    def render_inventory(self, rows, page, has_next):
+        formatted_inventory = "\n".join(clip(f"{item} x{count}" if count > 1 else item) for item, count in rows) or "Empty"
+        embed = discord.Embed(title=f"{self.name}'s Inventory", color=0x000000)
+        embed.add_field(name="02﹒ Items", value=formatted_inventory, inline=False)
+        embed.add_field(name="", value="", inline=False)  # Smaller empty field
+        embed.set_footer(text=f"Page {page + 1} ┃ use !cmds for all commands")
+        return embed
+
+    def update_buttons(self):
+        on_inventory = self.current_display == 'inventory'
+        self.previous_page.disabled = not on_inventory or self.inventory.page == 0
+        self.next_page.disabled = not on_inventory or not self.inventory.has_next
+
+    async def show(self, interaction, page=None):
+        if self.current_display == 'inventory':
+            self.embed = await self.inventory.show(self.inventory.page if page is None else page)
+        else:
+            self.embed = self.main_info
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.embed, view=self)
+
+    @discord.ui.button(label="Main Info", style=discord.ButtonStyle.primary, custom_id="main_info")
+    async def show_main_info(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_display = 'main_info'
+        await self.show(interaction)
+
+    @discord.ui.button(label="Inventory", style=discord.ButtonStyle.secondary, custom_id="inventory")
+    async def show_inventory(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_display = 'inventory'
+        await self.show(interaction)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, custom_id="inventory_previous")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(self.inventory.page - 1, 0))
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, custom_id="inventory_next")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.inventory.page + 1 if self.inventory.has_next else None)
+
+
+class ProfileListView(discord.ui.View):
+    def __init__(self, user_id, title):
+        super().__init__()
+        self.title = title
+        self.profiles = Pager(lambda after, limit: store.profiles_page(user_id, after, limit),
+                              self.render, key=lambda row: row)
+
+    def render(self, rows, page, has_next):
+        embed = discord.Embed(title=self.title, color=0x000000)
+        for name, role in rows:
+            embed.add_field(name=f"**{clip(name)}**", value=f"Role: {role.capitalize()}", inline=False)
+        if page or has_next:
+            embed.set_footer(text=f"Page {page + 1}")
+        return embed
+
+    async def show(self, page):
+        embed = await self.profiles.show(page)
+        self.previous_page.disabled = page == 0
+        self.next_page.disabled = not self.profiles.has_next
+        return embed
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, custom_id="profiles_previous")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = await self.show(max(self.profiles.page - 1, 0))
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, custom_id="profiles_next")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = await self.show(self.profiles.page + 1 if self.profiles.has_next else self.profiles.page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+
+class Profiles(commands.Cog):
+    """Muse profiles, their stats and inventories."""
+
+    help_section = "📝 ┃ Profile Commands"  # Where !cmds lists these commands
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await store.open()
+
+    async def cog_before_invoke(self, ctx):
+        if ctx.guild:
+            # Profiles without a guild join the leaderboards of the first guild their owner uses them in
+            store.claim_guild(ctx.author.id, ctx.guild.id)
+
+    # CREATE PROFILES
+    @commands.hybrid_command(name="createprofile", usage="[name] [role]", brief="Create a new profile")
+    async def create_profile(self, ctx, name: str, role: str):
+        """Allows a user to create a profile with a name and role."""
+
+        if role.lower() not in ["survivor", "killer"]:
+            await ctx.send("❌ ┃ Role must be 'Survivor' or 'Killer'.")
+            return
+
+        try:
+            await store.create_profile(ctx.author.id, name, role.capitalize(), ctx.guild.id if ctx.guild else None)
+        except Exception as e:
+            await ctx.send(f"Database error: {str(e)}")
+            return
+
+        await ctx.send(f"Created a profile for **{name}** as a **{role.capitalize()}**.")
+
+    @commands.hybrid_command(name="list", brief="List all your profiles")
+    async def list_profiles(self, ctx):
+        """Lists all profiles of the user."""
+
+        view = ProfileListView(ctx.author.id, f"{ctx.author.name}'s Profiles")
+        embed = await view.show(0)
+
+        if not embed.fields:
+            await ctx.send("❌ ┃ You don't have any profiles yet.")
+            return
+
+        # Buttons are only worth showing when there's more than one page
+        await ctx.send(embed=embed, view=view if view.profiles.has_next else None)
+
+    @commands.hybrid_command(name="deleteprofile", usage="[name] [role]", brief="Delete a profile")
+    async def delete_profile(self, ctx, name: str, role: str):
+        """Deletes the user's profile with the given name and role from the database."""
+
+        if role.lower() not in ["survivor", "killer"]:
+            await ctx.send("❌ ┃ Role must be 'Survivor' or 'Killer'.")
+            return
+
+        role = role.capitalize()  # Stored as "Survivor" or "Killer"
+        rowcount = await store.delete_profile(ctx.author.id, name, role)
+
+        if rowcount > 0:
+            await ctx.send(f"Profile for **{name}** has been deleted.")
+        else:
+            await ctx.send(f"❌ ┃ You don't have a **{role}** with the name **{name}**.")
+
+    @commands.hybrid_command(name="profile", usage="[name]", brief="View a profile")
+    async def open_profile(self, ctx, name: str):
+        """Opens the user's profile with the given name from the database."""
+
+        profile = await store.get_profile(ctx.author.id, name)
+
+        if not profile:
+            await ctx.send(f"❌ ┃ You don't have a profile with the name **{name}**!")
+            return
+
+        view = ProfileView(ctx.author.id, profile)
+        await ctx.send(embed=view.embed, view=view)
+
+    @commands.hybrid_command(name="updatestats", usage="[name] [stat] [value]", brief="Update profile stats")
+    async def update_stats(self, ctx, name: str, *, stats: str):
+        """Updates the stats for the user's profile with the given name."""
+
+        # Parse "Hunting 3, Fishing 2" into {stat: value}
+        stats_dict = {}
+        for stat in stats.split(","):
+            if stat:
+                key, value = stat.split()
+                stats_dict[key.strip()] = int(value.strip())
+
+        try:
+            rowcount = await store.set_stats(ctx.author.id, name, stats_dict)
+        except ValueError as e:
+            await ctx.send(f"❌ ┃ {e}")
+            return
+
+        if rowcount > 0:
+            await ctx.send(f"✅ ┃ Stats for **{name}** have been updated.")
+        else:
+            await ctx.send(f"❌ ┃ You don't have a profile with the name **{name}**!")
+
+    @commands.hybrid_command(name="additem", usage="[name] [item]", brief="Add item to inventory")
+    async def add_item(self, ctx, name: str, *, item: str):
+        """Adds an item to the inventory of the user's profile with the given name."""
+
+        rowcount = await store.add_item(ctx.author.id, name, item)
+
+        if rowcount > 0:
+            await ctx.send(f"Added **{item}** to **{name}**'s inventory.")
+        else:
+            await ctx.send(f"❌ ┃ You don't have a profile with the name **{name}**.")
+
+    @commands.hybrid_command(name="removeitem", usage="[name] [item]", brief="Remove item from inventory")
+    async def remove_item(self, ctx, name: str, *, item: str):
+        """Removes an item from the inventory of the user's profile with the given name."""
+
+        if not await store.get_profile(ctx.author.id, name):
+            await ctx.send(f"❌ ┃ You don't have a profile with the name **{name}**.")
+            return
+
+        rowcount = await store.remove_item(ctx.author.id, name, item)
+
+        if rowcount > 0:
+            await ctx.send(f"Removed **{item}** from **{name}**'s inventory.")
+        else:
+            await ctx.send(f"❌ ┃ Item **{item}** not found in **{name}**'s inventory.")
+
+    @commands.hybrid_command(name="muse", usage="[name]", brief="Choose the muse activity loot goes to")
+    async def active_muse(self, ctx, name: str = None):
+        """Sets the muse whose inventory hunting, scavenging, fishing and foraging loot goes to. Without a
+        name, shows the current one; with "none", stops depositing loot."""
+
+        if name is None:
+            active = await store.get_active_muse(ctx.author.id)
+            if active:
+                await ctx.send(f"Your active muse is **{active}**.")
+            else:
+                await ctx.send("You don't have an active muse. Use `!muse [name]` to choose one.")
+            return
+
+        if name.lower() == "none":
+            await store.clear_active_muse(ctx.author.id)
+            await ctx.send("Activity loot will no longer be added to an inventory.")
+            return
+
+        if await store.set_active_muse(ctx.author.id, name):
+            await ctx.send(f"✅ ┃ Activity loot now goes to **{name}**'s inventory.")
+        else:
+            await ctx.send(f"❌ ┃ You don't have a profile with the name **{name}**!")
+
+    @commands.hybrid_command(name="leaderboard", usage="[stat or items]", brief="Show the top muses for a stat or items")
+    async def leaderboard(self, ctx, board: str = ITEMS_BOARD):
+        """Shows this server's top muses by a stat, or by how many items they hold."""
+
+        board = board.lower()
+        rows = await store.leaderboard(board, ctx.guild.id if ctx.guild else None)
+        if not rows:
+            await ctx.send(f"❌ ┃ Nobody is on the **{board}** leaderboard yet.")
+            return
+
+        title = "Most Items" if board == ITEMS_BOARD else f"Top {board.capitalize()}"
+        lines = [f"**{rank}.** {clip(name)} (<@{user_id}>) ┃ {score}" for rank, (user_id, name, score) in enumerate(rows, 1)]
+        embed = discord.Embed(title=f"🏆 ┃ {title}", description="\n".join(lines), color=0x000000)
+        await ctx.send(embed=embed)
+
+    # SLASH COMMAND AUTOCOMPLETE
+    # Runs on every keystroke, so suggestions come from the store's in-memory prefix indexes
+    @delete_profile.autocomplete("name")
+    @open_profile.autocomplete("name")
+    @update_stats.autocomplete("name")
+    @add_item.autocomplete("name")
+    @remove_item.autocomplete("name")
+    @active_muse.autocomplete("name")
+    async def profile_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        names = await store.complete_profile_names(interaction.user.id, current)
+        return [app_commands.Choice(name=name, value=name) for name in names if len(name) <= MAX_CHOICE]
+
+    @remove_item.autocomplete("item")
+    async def item_autocomplete(self, interaction: discord.Interaction, current: str):
+        name = interaction.namespace.name
+        if not name:
+            return []
+        items = await store.complete_items(interaction.user.id, name, current)
+        return [app_commands.Choice(name=item, value=item) for item in items if len(item) <= MAX_CHOICE]
+
+    @leaderboard.autocomplete("board")
+    async def board_autocomplete(self, interaction: discord.Interaction, current: str):
+        boards = [ITEMS_BOARD, *(stat.lower() for stat in DEFAULT_STATS)]
+        return [app_commands.Choice(name=board, value=board) for board in boards if board.startswith(current.lower())]
+
+    @create_profile.autocomplete("role")
+    @delete_profile.autocomplete("role")
+    async def role_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=role, value=role) for role in ROLES if role.lower().startswith(current.lower())]
+
+
+async def setup(bot):
+    await bot.add_cog(Profiles(bot))
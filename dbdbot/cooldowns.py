@@ -0,0 +1,114 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# command -> (uses allowed in a burst, seconds for the burst to refill)
+# Override or extend with DBDBOT_COOLDOWNS, e.g. "hunting=3/60,roll=20/30"; a rate of 0 removes the limit
+COOLDOWNS = {
+    "hunting": (5, 60.0),
+    "scavenging": (5, 60.0),
+    "fishing": (5, 60.0),
+    "foraging": (5, 60.0),
+    "encounter": (3, 60.0),
+    "roll": (10, 30.0),
+}
+
+# Most (user, command) buckets kept at once; the least recently used are dropped beyond this
+MAX_BUCKETS = 50_000
+
+
+class OnCooldown(commands.CheckFailure):
+    def __init__(self, retry_after, notify):
+        super().__init__(f"On cooldown, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.notify = notify  # False once the user has been told, until their next successful use
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated", "full_at", "notified")
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated = now
+        self.full_at = now
+        self.notified = False
+
+
+class Cooldowns:
+    """Token buckets keyed by (user_id, command), O(1) per check.
+
+    A bucket holds up to `rate` uses and refills continuously over `per` seconds. Buckets are kept in
+    least-recently-used order; ones that have refilled completely are indistinguishable from new ones and
+    are dropped as they reach the front.
+
+    Buckets live in the process. Under dbdbot.supervisor each guild's commands all reach the same worker, so a
+    guild's limits hold; a user in guilds served by different workers gets separate buckets in each.
+    """
+
+    def __init__(self, limits=None, max_buckets=MAX_BUCKETS, clock=time.monotonic):
+        self.limits = dict(COOLDOWNS if limits is None else limits)
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, user_id, command):
+        """Uses one token. Returns (0.0, False) if allowed, else (seconds until the next token, whether
+        this is the first refusal since the user's last successful use).
+        """
+        limit = self.limits.get(command)
+        if not limit:
+            return 0.0, False
+        rate, per = limit
+        now = self.clock()
+        self._expire(now)
+
+        key = (user_id, command)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(rate, bucket.tokens + (now - bucket.updated) * rate / per)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.full_at = now + (rate - bucket.tokens) * per / rate
+            bucket.notified = False
+            return 0.0, False
+
+        notify = not bucket.notified
+        bucket.notified = True
+        return (1 - bucket.tokens) * per / rate, notify
+
+    def _expire(self, now):
+        while self._buckets:
+            bucket = next(iter(self._buckets.values()))
+            if bucket.full_at > now:
+                break
+            self._buckets.popitem(last=False)
+
+
+def limits_from_env():
+    """Returns COOLDOWNS with the overrides from DBDBOT_COOLDOWNS applied."""
+    limits = dict(COOLDOWNS)
+    for entry in os.getenv("DBDBOT_COOLDOWNS", "").split(","):
+        if not entry.strip():
+            continue
+        try:
+            command, limit = entry.split("=")
+            rate, per = limit.split("/")
+            limits[command.strip()] = (int(rate), float(per))
+        except ValueError:
+            logger.error(f"Ignoring malformed DBDBOT_COOLDOWNS entry {entry!r}; expected command=uses/seconds")
+    return {command: limit for command, limit in limits.items() if limit[0] > 0 and limit[1] > 0}
@@ -0,0 +1,196 @@
+import functools
+import random
+import re
+
+# Limits that keep a single roll cheap and its reply under Discord's message size
+MAX_DICE = 1000
+MAX_SIDES = 1000
+MAX_TERMS = 20
+MAX_EXPLOSIONS = 100
+MAX_LISTED = 100
+
+# Shorthands expanded before parsing
+ALIASES = {
+    "adv": "2d20kh1",
+    "advantage": "2d20kh1",
+    "dis": "2d20kl1",
+    "disadvantage": "2d20kl1",
+}
+
+_NUMBER = re.compile(r"\d+")
+_DICE = re.compile(r"(\d*)d(\d+|%)")
+_MODIFIER = re.compile(r"(kh|kl|k|dh|dl)(\d+)|!")
+
+
+class DiceError(ValueError):
+    """Raised for dice that can't or shouldn't be rolled."""
+
+
+FORMAT_HELP = "Invalid format! Use dice like 1d20, 2d6+3, 4d6kh3, 1d6! or adv."
+
+
+# EXPRESSION TREE
+class Constant:
+    def __init__(self, value):
+        self.value = value
+        self.dice = 0
+
+    def evaluate(self, rng):
+        return self.value, str(self.value)
+
+
+class Dice:
+    """NdX with optional keep/drop (kh, kl, dh, dl) and exploding (!) modifiers."""
+
+    def __init__(self, count, sides, keep=None, explode=False):
+        self.count = count
+        self.sides = sides
+        self.keep = keep  # ("kh" | "kl", n) once drops are converted to keeps
+        self.explode = explode
+        self.dice = count
+
+    def evaluate(self, rng):
+        rolls = roll_dice(self.count, self.sides, rng)
+        if self.explode:
+            extra = [roll for roll in rolls if roll == self.sides]
+            explosions = 0
+            while extra and explosions < MAX_EXPLOSIONS:
+                extra = roll_dice(min(len(extra), MAX_EXPLOSIONS - explosions), self.sides, rng)
+                explosions += len(extra)
+                rolls.extend(extra)
+                extra = [roll for roll in extra if roll == self.sides]
+
+        kept = range(len(rolls))
+        if self.keep:
+            kind, n = self.keep
+            order = sorted(range(len(rolls)), key=rolls.__getitem__, reverse=(kind == "kh"))
+            kept = set(order[:n])
+
+        total = sum(rolls[i] for i in kept)
+        if len(rolls) > MAX_LISTED:
+            return total, f"({len(rolls)} dice)"
+        listed = ", ".join(str(roll) if i in kept else f"~~{roll}~~" for i, roll in enumerate(rolls))
+        return total, f"({listed})"
+
+
+class Expression:
+    """A compiled dice expression: a signed sum of dice and constant terms."""
+
+    def __init__(self, text, terms):
+        self.text = text
+        self.terms = terms  # [(sign, Dice | Constant)]
+
+    def is_plain(self, count, sides):
+        """True for an unmodified NdX such as the 1d20 an encounter fight needs."""
+        if len(self.terms) != 1:
+            return False
+        sign, term = self.terms[0]
+        return (sign == 1 and isinstance(term, Dice) and term.count == count and term.sides == sides
+                and not term.keep and not term.explode)
+
+    def roll(self, rng=random):
+        return RollResult(self, [(sign, term, *term.evaluate(rng)) for sign, term in self.terms])
+
+
+class RollResult:
+    def __init__(self, expression, parts):
+        self.expression = expression
+        self.parts = parts  # [(sign, term, value, shown)]
+        self.total = sum(sign * value for sign, _, value, _ in parts)
+
+    def describe(self):
+        """Markdown for the roll: the bare results for a single plain die term, otherwise a breakdown and total."""
+        if len(self.parts) == 1:
+            sign, term, value, shown = self.parts[0]
+            if sign == 1 and isinstance(term, Dice) and not term.keep and not term.explode:
+                if term.count > MAX_LISTED:
+                    return f"**{term.count} dice totalling {value}**"
+                return f"**{shown[1:-1]}**"
+
+        breakdown = ""
+        for sign, _, _, shown in self.parts:
+            if breakdown or sign == -1:
+                breakdown += " - " if sign == -1 else " + "
+            breakdown += shown
+        return f"{self.expression.text}: {breakdown.strip()} = **{self.total}**"
+
+
+# PARSING
+@functools.lru_cache(maxsize=512)
+def compile_expression(raw):
+    """Parses a dice expression into an Expression. Cached on the raw text so repeat rolls skip parsing."""
+    text = "".join(raw.lower().split())
+    text = ALIASES.get(text, text)
+    if not text:
+        raise DiceError(FORMAT_HELP)
+
+    terms = []
+    pos = 0
+    sign = 1
+    while True:
+        term, pos = _parse_term(text, pos)
+        terms.append((sign, term))
+        if pos == len(text):
+            break
+        if text[pos] not in "+-":
+            raise DiceError(FORMAT_HELP)
+        sign = 1 if text[pos] == "+" else -1
+        pos += 1
+
+    if len(terms) > MAX_TERMS:
+        raise DiceError(f"You can use at most {MAX_TERMS} terms in one roll.")
+    if sum(term.dice for _, term in terms) > MAX_DICE:
+        raise DiceError(f"You can roll at most {MAX_DICE} dice with up to {MAX_SIDES} sides at once.")
+    return Expression(text, tuple(terms))
+
+
+def _parse_term(text, pos):
+    for alias, expansion in ALIASES.items():
+        if text.startswith(alias, pos) and not text[pos + len(alias):pos + len(alias) + 1].isalpha():
+            return _parse_term(expansion, 0)[0], pos + len(alias)
+
+    match = _DICE.match(text, pos)
+    if not match:
+        match = _NUMBER.match(text, pos)
+        if not match:
+            raise DiceError(FORMAT_HELP)
+        return Constant(int(match.group())), match.end()
+
+    count = int(match.group(1)) if match.group(1) else 1
+    sides = 100 if match.group(2) == "%" else int(match.group(2))
+    if count <= 0 or sides <= 0:
+        raise DiceError("Please enter a valid dice format, e.g., 1d20.")
+    if count > MAX_DICE or sides > MAX_SIDES:
+        raise DiceError(f"You can roll at most {MAX_DICE} dice with up to {MAX_SIDES} sides at once.")
+
+    keep = None
+    explode = False
+    pos = match.end()
+    while modifier := _MODIFIER.match(text, pos):
+        pos = modifier.end()
+        if modifier.group() == "!":
+            if sides == 1:
+                raise DiceError("A d1 can't explode.")
+            explode = True
+            continue
+        if keep:
+            raise DiceError("Use only one keep or drop modifier per dice term.")
+        kind, n = modifier.group(1), int(modifier.group(2))
+        if not 0 < n <= count:
+            raise DiceError(f"You can't keep or drop {n} of {count} dice.")
+        if kind == "k":
+            kind = "kh"
+        if kind == "dh":
+            kind, n = "kl", count - n
+        elif kind == "dl":
+            kind, n = "kh", count - n
+        keep = (kind, n)
+    return Dice(count, sides, keep, explode), pos
+
+
+# ROLLING
+def roll_dice(count, sides, rng=random):
+    """Rolls count dice with the given number of sides in one batch."""
+    if count == 1:
+        return [rng.randint(1, sides)]
+    return rng.choices(range(1, sides + 1), k=count)
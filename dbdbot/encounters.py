@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Abandoned encounters are forgotten after this many seconds without activity
+SESSION_TTL = 15 * 60
+
+# How often changed sessions are written to the database
+FLUSH_INTERVAL = 2.0
+
+# Outcomes of one round of a fight
+BEAST_FLED = "beast_fled"
+WON = "won"
+INJURED = "injured"
+KILLED = "killed"
+
+# Rolls between these (inclusive) are the survival threshold a player's 1d20 has to beat
+SURVIVAL_THRESHOLD = (10, 20)
+
+
+def resolve_round(roll, beast_roll, survival_threshold, failed_attempts):
+    """Applies the fight rules to one 1d20 roll. Returns (outcome, failed_attempts after the round)."""
+    if roll == beast_roll:
+        return BEAST_FLED, failed_attempts
+    if roll > survival_threshold:
+        return WON, failed_attempts
+    failed_attempts += 1
+    return (INJURED if failed_attempts == 1 else KILLED), failed_attempts
+
+
+class EncounterSession:
+    def __init__(self, beast, failed_attempts=0, engaged=False, message_id=None, expires_at=0.0):
+        self.beast = beast
+        self.failed_attempts = failed_attempts
+        self.engaged = engaged  # True once the player chose to fight
+        self.message_id = message_id  # Message whose buttons control this encounter
+        self.expires_at = expires_at
+
+
+class EncounterStore:
+    """Active encounters keyed by (guild_id, channel_id, user_id).
+
+    Sessions are kept in order of last use, so expiring abandoned ones only ever looks at the oldest entries.
+    Changes are written behind to the database every FLUSH_INTERVAL seconds so fights survive a restart.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._dirty = set()
+        self._ended = set()
+        self._db = None
+        self._flush_task = None
+        self._closing = asyncio.Event()
+
+    def __len__(self):
+        self._expire()
+        return len(self._sessions)
+
+    def get(self, key):
+        """Returns the live session for key, refreshing its expiry, or None."""
+        self._expire()
+        session = self._sessions.get(key)
+        if session:
+            self._touch(key, session)
+        return session
+
+    def start(self, key, beast):
+        """Starts (or restarts) an encounter with beast for key."""
+        self._expire()
+        session = EncounterSession(beast)
+        self._touch(key, session)
+        return session
+
+    def update(self, key):
+        """Schedules a changed session to be written to the database."""
+        session = self._sessions.get(key)
+        if session:
+            self._touch(key, session)
+
+    def end(self, key):
+        if self._sessions.pop(key, None):
+            self._dirty.discard(key)
+            self._ended.add(key)
+
+    def _touch(self, key, session):
+        session.expires_at = self.clock() + self.ttl
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        self._dirty.add(key)
+        self._ended.discard(key)
+
+    def _expire(self):
+        now = self.clock()
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if session.expires_at > now:
+                break
+            self.end(key)
+
+    # PERSISTENCE
+    async def open(self, db, interval=FLUSH_INTERVAL, owns_guild=None):
+        """Loads unexpired sessions from db and starts the background flush.
+
+        With several bot processes, owns_guild(guild_id) picks the sessions this one serves; the others are
+        left to the process whose shards they belong to.
+        """
+        self._db = db
+        for key, session in await db.load_encounter_sessions(self.clock()):
+            if owns_guild is None or owns_guild(key[0]):
+                self._sessions[key] = session
+        # Keep the oldest-expiring sessions at the front
+        for key in sorted(self._sessions, key=lambda key: self._sessions[key].expires_at):
+            self._sessions.move_to_end(key)
+        logger.info(f"Restored {len(self._sessions)} encounter sessions")
+        self._closing.clear()
+        self._flush_task = asyncio.create_task(self._flush_loop(interval))
+
+    async def close(self):
+        """Stops the background flush and writes any pending changes."""
+        if self._flush_task:
+            # Let a flush that is under way finish rather than cancelling it halfway through
+            self._closing.set()
+            await self._flush_task
+            self._flush_task = None
+        if self._db:
+            await self.flush()
+
+    async def flush(self):
+        """Writes every changed and ended session in one transaction."""
+        self._expire()
+        if not self._dirty and not self._ended:
+            return
+        dirty, self._dirty = self._dirty, set()
+        ended, self._ended = self._ended, set()
+        rows = [(*key, self._sessions[key]) for key in dirty if key in self._sessions]
+        try:
+            await self._db.save_encounter_sessions(rows, list(ended))
+        except BaseException:
+            # Try again on the next flush unless something newer replaced them; also if the flush was cancelled
+            self._dirty |= {key for key in dirty if key in self._sessions and key not in self._ended}
+            self._ended |= {key for key in ended if key not in self._sessions}
+            raise
+
+    async def _flush_loop(self, interval):
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error saving encounter sessions: {e}")
+
+
+def session_key(guild_id, channel_id, user_id):
+    # DMs have no guild; 0 keeps the key usable as a database primary key
+    return (guild_id or 0, channel_id, user_id)
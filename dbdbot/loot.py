@@ -0,0 +1,118 @@
+import functools
+import itertools
+import logging
+import os
+import random
+import tomllib
+
+logger = logging.getLogger(__name__)
+
+LOOT_TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "loot_tables.toml")
+
+# Data file versions this module knows how to read
+SUPPORTED_VERSIONS = (1,)
+
+# Every data file must define these tables
+TABLE_NAMES = ("hunting", "scavenging", "fishing", "foraging", "locations", "encounters")
+
+
+class LootTable:
+    """Weighted outcomes drawn in O(1) time with Vose's alias method.
+
+    The table is built with integer arithmetic, so every outcome is drawn with exactly
+    weight / total probability.
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        if not self.entries:
+            raise ValueError("A loot table needs at least one outcome")
+        if any(type(weight) is not int or weight <= 0 for _, weight in self.entries):
+            raise ValueError("Loot table weights must be positive integers")
+
+        self.outcomes = tuple(outcome for outcome, _ in self.entries)
+        self.total = sum(weight for _, weight in self.entries)
+        self._cum_weights = tuple(itertools.accumulate(weight for _, weight in self.entries))
+
+        # Each column holds `total` units; an outcome's share is weight * n of them
+        size = len(self.entries)
+        scaled = [weight * size for _, weight in self.entries]
+        self._threshold = [self.total] * size
+        self._alias = list(range(size))
+        small = [i for i, units in enumerate(scaled) if units < self.total]
+        large = [i for i, units in enumerate(scaled) if units >= self.total]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._threshold[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= self.total - scaled[less]
+            (small if scaled[more] < self.total else large).append(more)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def draw(self, rng=random):
+        """Returns one random outcome."""
+        column = rng.randrange(len(self.outcomes))
+        if rng.randrange(self.total) < self._threshold[column]:
+            return self.outcomes[column]
+        return self.outcomes[self._alias[column]]
+
+    def draw_many(self, count, rng=random):
+        """Returns count random outcomes, drawn in one batch."""
+        return rng.choices(self.outcomes, cum_weights=self._cum_weights, k=count)
+
+
+# LOADING
+@functools.lru_cache(maxsize=64)
+def _compile(entries):
+    """Builds the sampler for one table. Tables whose entries didn't change are reused across reloads."""
+    return LootTable(entries)
+
+
+@functools.lru_cache(maxsize=4)
+def _parse(path, mtime_ns, size):
+    """Parses and compiles a data file. Keyed on the file's mtime and size so unchanged files aren't re-read."""
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    version = data.get("version")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported loot table version {version!r} in {path}")
+    missing = [name for name in TABLE_NAMES if name not in data]
+    if missing:
+        raise ValueError(f"Missing loot tables in {path}: {', '.join(missing)}")
+
+    tables = {}
+    for name in TABLE_NAMES:
+        try:
+            tables[name] = _compile(tuple(data[name].items()))
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid loot table [{name}] in {path}: {e}") from e
+    return version, tables
+
+
+_tables = None
+_version = None
+
+
+def load_tables(path=LOOT_TABLES_PATH):
+    """Loads (or reloads) the loot tables from the data file and swaps them in all at once.
+
+    If the file is invalid an exception is raised and the tables in use are left untouched.
+    Returns the data file version.
+    """
+    global _tables, _version
+    stat = os.stat(path)
+    version, tables = _parse(path, stat.st_mtime_ns, stat.st_size)
+    if tables is not _tables:
+        _tables, _version = tables, version
+        logger.info(f"Loaded loot tables v{version} from {path}")
+    return version
+
+
+def table(name):
+    """Returns the compiled loot table with the given name, loading the data file on first use."""
+    if _tables is None:
+        load_tables()
+    return _tables[name]
@@ -0,0 +1,105 @@
+import bisect
+import functools
+import time
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; memory stays constant however many samples are recorded."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, failed=False):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if failed:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Estimates the q-th quantile by interpolating inside the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if BUCKETS[i] != float("inf") else lower * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-2]
+
+
+class Registry:
+    def __init__(self):
+        self.commands = {}  # command name -> Histogram
+        self.queries = {}  # normalized SQL -> Histogram
+
+    def observe_command(self, name, seconds, failed=False):
+        histogram = self.commands.get(name)
+        if histogram is None:
+            histogram = self.commands[name] = Histogram()
+        histogram.observe(seconds, failed)
+
+    @contextmanager
+    def time_query(self, sql):
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            label = _normalize(sql)
+            histogram = self.queries.get(label)
+            if histogram is None:
+                histogram = self.queries[label] = Histogram()
+            histogram.observe(time.perf_counter() - start, failed)
+
+    def reset(self):
+        self.commands.clear()
+        self.queries.clear()
+
+    def prometheus(self):
+        """Renders every histogram in the Prometheus text exposition format."""
+        lines = []
+        for metric, label, histograms, help_text in (
+            ("dbdbot_command", "command", self.commands, "Bot command latency"),
+            ("dbdbot_query", "query", self.queries, "Profile store SQL statement latency"),
+        ):
+            lines.append(f"# HELP {metric}_duration_seconds {help_text}.")
+            lines.append(f"# TYPE {metric}_duration_seconds histogram")
+            for name, histogram in histograms.items():
+                labels = f'{label}="{_escape(name)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{metric}_duration_seconds_count{{{labels}}} {histogram.count}")
+            lines.append(f"# HELP {metric}_errors_total {help_text} failures.")
+            lines.append(f"# TYPE {metric}_errors_total counter")
+            for name, histogram in histograms.items():
+                lines.append(f'{metric}_errors_total{{{label}="{_escape(name)}"}} {histogram.errors}')
+        return "\n".join(lines) + "\n"
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared registry used by the bot
+registry = Registry()
@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# Send priorities; lower goes first. Interactions fail if they aren't answered within 3 seconds.
+INTERACTION = 0
+CHANNEL = 1
+
+# Channel sends in flight at once across the whole bot
+SEND_CONCURRENCY = 4
+
+# How many times a rate limited send is retried, and the backoff when Discord doesn't say how long to wait
+SEND_RETRIES = 2
+BACKOFF = 1.0
+
+# Longest single message Discord accepts
+MAX_CONTENT = 2000
+
+
+class SendQueue:
+    """Shared gate for outbound messages.
+
+    At most `concurrency` sends run at once and waiting interaction responses go ahead of channel messages.
+    A 429 pauses every send until it has passed, so a burst backs off as a whole instead of each command
+    retrying into the limit on its own.
+    """
+
+    def __init__(self, concurrency=SEND_CONCURRENCY, retries=SEND_RETRIES):
+        self.concurrency = concurrency
+        self.retries = retries
+        self._active = 0
+        self._waiting = []  # heap of (priority, order, future)
+        self._order = itertools.count()
+        self._resume_at = 0.0
+
+    async def send(self, send, priority=CHANNEL):
+        """Awaits send() once a slot is free, retrying it on rate limits. Returns its result."""
+        await self._acquire(priority)
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in range(self.retries + 1):
+                delay = self._resume_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    return await send()
+                except discord.RateLimited as e:
+                    if attempt == self.retries:
+                        raise
+                    backoff = e.retry_after
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == self.retries:
+                        raise
+                    backoff = BACKOFF * 2 ** attempt
+                logger.warning(f"Rate limited; pausing outbound messages for {backoff:.1f}s")
+                self._resume_at = max(self._resume_at, loop.time() + backoff)
+        finally:
+            self._release()
+
+    async def _acquire(self, priority):
+        if self._active < self.concurrency and not self._waiting:
+            self._active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), future))
+        try:
+            await future  # The slot is handed over by _release
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # Got the slot just as it was cancelled; pass it on
+            raise
+
+    def _release(self):
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+class DBDContext(commands.Context):
+    """Context whose plain text replies are coalesced.
+
+    Text-only sends are held back and return None. They're put in front of the next send that has an embed,
+    view or other options, or sent together once the command finishes, so a command that replies in several
+    steps costs one message. Every send goes through the bot's SendQueue.
+    """
+
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        self._pending = []
+
+    async def send(self, content=None, **kwargs):
+        if content is not None and not kwargs:
+            self._pending.append(str(content))
+            return None
+        if self._pending:
+            lines = self._take_pending()
+            if content is not None:
+                lines.append(str(content))
+            *earlier, content = _chunks(lines)
+            for chunk in earlier:
+                await self._send(chunk)
+        return await self._send(content, **kwargs)
+
+    async def flush(self):
+        """Sends any held back text."""
+        if self._pending:
+            for chunk in _chunks(self._take_pending()):
+                await self._send(chunk)
+
+    def _take_pending(self):
+        pending, self._pending = self._pending, []
+        return pending
+
+    async def _send(self, content=None, **kwargs):
+        priority = INTERACTION if self.interaction is not None else CHANNEL
+        return await self.bot.send_queue.send(lambda: super(DBDContext, self).send(content, **kwargs), priority)
+
+
+def _chunks(lines):
+    """Joins lines into as few messages as fit Discord's length limit."""
+    chunks = []
+    current = ""
+    for line in lines:
+        while len(line) > MAX_CONTENT:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:MAX_CONTENT])
+            line = line[MAX_CONTENT:]
+        if current and len(current) + 1 + len(line) > MAX_CONTENT:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    chunks.append(current)
+    return chunks
@@ -0,0 +1,921 @@
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+from .encounters import EncounterSession
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "profiles.db"
+
+# Stats every new muse starts with, in display order
+DEFAULT_STATS = ("Hunting", "Scavenging", "Fishing", "Foraging")
+
+# Profile writes are batched and committed together after this many seconds or queued statements
+FLUSH_INTERVAL = 0.25
+FLUSH_MAX_WRITES = 100
+
+# How many profiles and profile lists are kept in memory
+CACHE_SIZE = 1024
+
+# Leaderboards are served from memory for this many seconds before being read again
+LEADERBOARD_TTL = 30.0
+
+# Board counting every item in a muse's inventory; the other boards are stats, by lowercased name
+ITEMS_BOARD = "items"
+
+# Range of an SQLite INTEGER; larger stat values can't be stored
+MIN_INTEGER = -2 ** 63
+MAX_INTEGER = 2 ** 63 - 1
+
+
+class WriteRejected(Exception):
+    """A statement the writer process couldn't write, for the reasons in REJECTED."""
+
+
+# Errors caused by a statement itself, which retrying won't fix, as opposed to the database being busy
+REJECTED = (sqlite3.IntegrityError, sqlite3.InterfaceError, OverflowError, WriteRejected)
+
+# Cached for users known to have no active muse, so they aren't looked up on every activity
+NO_ACTIVE_MUSE = ("", "")
+
+# Applied to every pooled connection when it is opened
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA foreign_keys = ON",
+)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        user_id INTEGER,
+        name TEXT,
+        role TEXT,
+        stats TEXT,
+        inventory TEXT,
+        PRIMARY KEY (user_id, name, role)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_items (
+        user_id INTEGER,
+        name TEXT,
+        role TEXT,
+        item TEXT,
+        count INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (user_id, name, role, item),
+        FOREIGN KEY (user_id, name, role) REFERENCES profiles (user_id, name, role) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS profile_stats (
+        user_id INTEGER,
+        name TEXT,
+        role TEXT,
+        stat TEXT,
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, name, role, stat),
+        FOREIGN KEY (user_id, name, role) REFERENCES profiles (user_id, name, role) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS active_muses (
+        user_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        role TEXT NOT NULL,
+        FOREIGN KEY (user_id, name, role) REFERENCES profiles (user_id, name, role) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS leaderboard_scores (
+        board TEXT,
+        user_id INTEGER,
+        name TEXT,
+        role TEXT,
+        guild_id INTEGER,
+        score INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (board, user_id, name, role),
+        FOREIGN KEY (user_id, name, role) REFERENCES profiles (user_id, name, role) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS encounter_sessions (
+        guild_id INTEGER,
+        channel_id INTEGER,
+        user_id INTEGER,
+        beast TEXT NOT NULL,
+        failed_attempts INTEGER NOT NULL DEFAULT 0,
+        engaged INTEGER NOT NULL DEFAULT 0,
+        message_id INTEGER,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (guild_id, channel_id, user_id)
+    )
+    """,
+)
+
+
+# MIGRATIONS
+# Each entry upgrades the database by one version; PRAGMA user_version records how many have run.
+async def _migrate_inventory_json(db):
+    """Moves the old JSON inventory blobs into inventory_items."""
+    async with db.execute("SELECT user_id, name, role, inventory FROM profiles WHERE inventory IS NOT NULL") as cursor:
+        rows = await cursor.fetchall()
+
+    items = []
+    migrated = []
+    for user_id, name, role, inventory in rows:
+        try:
+            inventory = json.loads(inventory) if inventory else {}
+        except json.JSONDecodeError as e:
+            # Left in place so the data isn't lost
+            logger.error(f"JSON decode error migrating inventory of {name} ({user_id}): {e}")
+            continue
+        migrated.append((user_id, name, role))
+        items.extend((user_id, name, role, item, count) for item, count in inventory.items() if count > 0)
+
+    await db.executemany("""
+        INSERT INTO inventory_items (user_id, name, role, item, count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, name, role, item) DO UPDATE SET count = count + excluded.count
+    """, items)
+    await db.executemany("UPDATE profiles SET inventory = NULL WHERE user_id = ? AND name = ? AND role = ?",
+                         migrated)
+    logger.info(f"Migrated {len(items)} inventory entries from {len(migrated)} profiles")
+
+
+async def _migrate_stats_text(db):
+    """Moves the old "Hunting: 0\nScavenging: 0" stats strings into profile_stats."""
+    async with db.execute("SELECT user_id, name, role, stats FROM profiles WHERE stats IS NOT NULL") as cursor:
+        rows = await cursor.fetchall()
+
+    stats = []
+    migrated = []
+    for user_id, name, role, text in rows:
+        try:
+            parsed = [line.split(": ") for line in text.split("\n") if line]
+            parsed = [(key.strip(), int(value.strip())) for key, value in parsed]
+        except ValueError as e:
+            # Left in place so the data isn't lost
+            logger.error(f"Error migrating stats of {name} ({user_id}): {e}")
+            continue
+        migrated.append((user_id, name, role))
+        stats.extend((user_id, name, role, key, value) for key, value in parsed)
+
+    await db.executemany("""
+        INSERT OR REPLACE INTO profile_stats (user_id, name, role, stat, value)
+        VALUES (?, ?, ?, ?, ?)
+    """, stats)
+    await db.executemany("UPDATE profiles SET stats = NULL WHERE user_id = ? AND name = ? AND role = ?",
+                         migrated)
+    logger.info(f"Migrated {len(stats)} stats from {len(migrated)} profiles")
+
+
+async def _add_lookup_indexes(db):
+    """Indexes the lookups the primary keys don't already cover.
+
+    Profile, stat and item lookups by (user_id[, name[, role]]) are served by the primary keys. These let a
+    muse's stats and items be read back in the order they were added (index order is key order, then
+    rowid) without a sort, and let expired encounters be deleted without scanning every session.
+    """
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS profile_stats_by_profile ON profile_stats (user_id, name, role)",
+        "CREATE INDEX IF NOT EXISTS inventory_items_by_profile ON inventory_items (user_id, name, role)",
+        "CREATE INDEX IF NOT EXISTS encounter_sessions_by_expiry ON encounter_sessions (expires_at)",
+    ):
+        await db.execute(statement)
+
+
+async def _add_leaderboards(db):
+    """Records the guild each profile belongs to and fills leaderboard_scores from the existing stats and items.
+
+    Profiles made before this have no guild, so they only show up on the global boards until their owner next
+    uses a command in a guild (see ProfileStore.claim_guild).
+    """
+    await db.execute("ALTER TABLE profiles ADD COLUMN guild_id INTEGER")
+    await db.execute("""
+        INSERT OR REPLACE INTO leaderboard_scores (board, user_id, name, role, score)
+        SELECT lower(stat), user_id, name, role, MAX(value) FROM profile_stats
+        GROUP BY lower(stat), user_id, name, role
+    """)
+    await db.execute("""
+        INSERT OR REPLACE INTO leaderboard_scores (board, user_id, name, role, score)
+        SELECT ?, user_id, name, role, SUM(count) FROM inventory_items
+        GROUP BY user_id, name, role
+    """, (ITEMS_BOARD,))
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS leaderboard_scores_top ON leaderboard_scores (board, score)",
+        "CREATE INDEX IF NOT EXISTS leaderboard_scores_guild_top ON leaderboard_scores (board, guild_id, score)",
+        "CREATE INDEX IF NOT EXISTS leaderboard_scores_by_profile ON leaderboard_scores (user_id, name, role)",
+    ):
+        await db.execute(statement)
+
+
+MIGRATIONS = (
+    _migrate_inventory_json,
+    _migrate_stats_text,
+    _add_lookup_indexes,
+    _add_leaderboards,
+)
+
+
+class Profile:
+    def __init__(self, user_id, name, role, stats, inventory, guild_id=None):
+        self.user_id = user_id
+        self.name = name
+        self.role = role
+        self.stats = stats  # {stat: value} in display order
+        self.inventory = inventory  # {item: count} in the order items were first added
+        self.guild_id = guild_id  # Guild whose leaderboards the muse is on; None for global only
+
+    def copy(self):
+        return Profile(self.user_id, self.name, self.role, dict(self.stats), dict(self.inventory), self.guild_id)
+
+
+def _check_integer(stat, value):
+    if not MIN_INTEGER <= value <= MAX_INTEGER:
+        raise ValueError(f"{stat} must be between {MIN_INTEGER} and {MAX_INTEGER}.")
+
+
+class LRUCache:
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def pop(self, key):
+        self._items.pop(key, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def keys(self):
+        return list(self._items)
+
+
+class PrefixIndex:
+    """Sorted set of strings answering case-insensitive prefix queries with a binary search."""
+
+    def __init__(self, values=()):
+        self._keys = sorted({(value.casefold(), value) for value in values})
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, value):
+        key = (value.casefold(), value)
+        i = bisect.bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            self._keys.insert(i, key)
+
+    def remove(self, value):
+        key = (value.casefold(), value)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def search(self, prefix, limit=25):
+        """Returns up to limit values starting with prefix, ignoring case, in alphabetical order."""
+        prefix = prefix.casefold()
+        matches = []
+        for i in range(bisect.bisect_left(self._keys, (prefix,)), len(self._keys)):
+            folded, value = self._keys[i]
+            if len(matches) == limit or not folded.startswith(prefix):
+                break
+            matches.append(value)
+        return matches
+
+
+class ProfileStore:
+    """Long-lived pool of aiosqlite connections shared by all profile commands.
+
+    Hot profiles and profile lists are served from an LRU cache. Profile changes are applied to the cache
+    straight away and queued, then committed in one transaction every FLUSH_INTERVAL seconds or
+    FLUSH_MAX_WRITES statements, whichever comes first. Anything still queued is written on close().
+
+    When `writer` is set, the transactions are committed by the process at the other end of it instead and
+    only reads use the pool; see dbdbot.writer.
+    """
+
+    def __init__(self, path=DB_PATH, size=4, flush_interval=FLUSH_INTERVAL, flush_max_writes=FLUSH_MAX_WRITES,
+                 cache_size=CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self.flush_interval = flush_interval
+        self.flush_max_writes = flush_max_writes
+        self._pool = None
+        self._connections = []
+        self._open_lock = asyncio.Lock()
+        self._profiles = LRUCache(cache_size)  # (user_id, name) -> Profile
+        self._lists = LRUCache(cache_size)  # user_id -> [(name, role)]
+        self._name_index = LRUCache(cache_size)  # user_id -> PrefixIndex of profile names
+        self._item_index = LRUCache(cache_size)  # (user_id, name) -> PrefixIndex of inventory items
+        self._leaderboards = LRUCache(64)  # (board, guild_id, limit) -> (expires_at, rows)
+        self._active = LRUCache(cache_size)  # user_id -> (name, role) of the active muse, or NO_ACTIVE_MUSE
+        self._guild_claimed = LRUCache(cache_size)  # user_id -> True once claim_guild has run for them
+        self._pending = []
+        self._pending_users = set()  # Whose profiles the queued statements change
+        self._generation = 0  # Bumped whenever another process's writes drop cached entries
+        self.writer = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._flush_task = None
+        self._closing = False
+
+    @property
+    def is_open(self):
+        return self._pool is not None
+
+    async def open(self):
+        """Opens the pool and makes sure the schema exists. Safe to call more than once."""
+        async with self._open_lock:
+            if self.is_open:
+                return
+            pool = asyncio.Queue()
+            try:
+                for _ in range(self.size):
+                    db = await aiosqlite.connect(self.path)
+                    self._connections.append(db)
+                    for pragma in PRAGMAS:
+                        await db.execute(pragma)
+                    pool.put_nowait(db)
+                await self._apply_schema(self._connections[0])
+            except Exception:
+                await self._close_connections()
+                raise
+            self._pool = pool
+            self._closing = False
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info(f"Opened profile store {self.path} with {self.size} connections")
+
+    async def _apply_schema(self, db):
+        for statement in SCHEMA:
+            await db.execute(statement)
+        async with db.execute("PRAGMA user_version") as cursor:
+            (version,) = await cursor.fetchone()
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            logger.info(f"Applying database migration {number}: {migration.__name__}")
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {number}")
+        await db.commit()
+
+    async def close(self):
+        """Writes any queued profile changes and closes every pooled connection."""
+        async with self._open_lock:
+            if not self.is_open:
+                return
+            # Let a flush that is under way finish rather than cancelling it halfway through
+            self._closing = True
+            self._flush_requested.set()
+            await self._flush_task
+            self._flush_task = None
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error writing queued profile changes on close: {e}")
+            self._pool = None
+            self.clear_caches()
+            if self.writer is not None:
+                await self.writer.close()
+                self.writer = None
+            await self._close_connections()
+            logger.info(f"Closed profile store {self.path}")
+
+    async def _close_connections(self):
+        connections, self._connections = self._connections, []
+        for db in connections:
+            try:
+                await db.close()
+            except Exception as e:
+                logger.error(f"Error closing database connection: {e}")
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrows a connection from the pool for the duration of the block."""
+        if not self.is_open:
+            raise RuntimeError("Profile store is not open")
+        pool = self._pool
+        db = await pool.get()
+        try:
+            yield db
+        finally:
+            pool.put_nowait(db)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Borrows a connection and commits everything done in the block as one transaction."""
+        async with self.connection() as db:
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            with registry.time_query("COMMIT"):
+                await db.commit()
+
+    async def _run(self, db, sql, params=(), many=False):
+        """Runs one statement on a borrowed connection, recording its latency."""
+        with registry.time_query(sql):
+            if many:
+                return await db.executemany(sql, params)
+            return await db.execute(sql, params)
+
+    async def fetchone(self, sql, params=()):
+        async with self.connection() as db:
+            with registry.time_query(sql):
+                async with db.execute(sql, params) as cursor:
+                    return await cursor.fetchone()
+
+    async def fetchall(self, sql, params=()):
+        async with self.connection() as db:
+            with registry.time_query(sql):
+                async with db.execute(sql, params) as cursor:
+                    return await cursor.fetchall()
+
+    async def execute(self, sql, params=()):
+        """Runs a single write statement, commits it and returns the affected row count."""
+        async with self.transaction() as db:
+            cursor = await self._run(db, sql, params)
+            return cursor.rowcount
+
+    def clear_caches(self):
+        """Forgets everything cached, for when the database was changed behind the store's back."""
+        self._generation += 1  # Nor may reads already in flight cache what they read
+        for cache in (self._profiles, self._lists, self._name_index, self._item_index, self._active,
+                      self._leaderboards, self._guild_claimed):
+            cache.clear()
+
+    def forget_users(self, user_ids):
+        """Drops everything cached about the users, after another process changed their profiles."""
+        user_ids = set(user_ids)
+        self._generation += 1  # Reads already in flight may have seen the old rows; don't let them cache those
+        for cache in (self._lists, self._name_index, self._active):
+            for user_id in user_ids:
+                cache.pop(user_id)
+        for cache in (self._profiles, self._item_index):
+            for key in cache.keys():
+                if key[0] in user_ids:
+                    cache.pop(key)
+
+    # WRITE QUEUE
+    def _queue(self, user_id, sql, params=(), many=False):
+        self._pending.append((sql, params, many))
+        self._pending_users.add(user_id)
+        if len(self._pending) >= self.flush_max_writes:
+            self._flush_requested.set()
+
+    async def _flush_user(self, user_id):
+        """Makes the user's queued changes readable from the database, skipping the flush when there are none."""
+        if user_id in self._pending_users or self._flush_lock.locked():
+            await self.flush()  # Also waits out a flush under way, which may be writing theirs
+
+    async def flush(self, then=None):
+        """Commits every queued profile change in one transaction.
+
+        then is an optional (sql, params) statement run last in the same transaction; its row count is returned.
+        """
+        async with self._flush_lock:
+            pending, self._pending = self._pending, []
+            users, self._pending_users = self._pending_users, set()
+            if not pending and not then:
+                return 0
+            try:
+                return await self.write(pending, then, users)
+            except REJECTED as e:
+                logger.error(f"Error writing {len(pending)} queued profile changes, retrying them one by one: {e}")
+                return await self._write_each(pending, then, users)
+            except BaseException:
+                # Keep them, ahead of anything queued since, for the next attempt; also if the flush was cancelled
+                self._pending[:0] = pending
+                self._pending_users |= users
+                raise
+
+    async def _write_each(self, pending, then, users):
+        """Writes a batch that failed one statement at a time, dropping the statements that can't be written."""
+        for index, (sql, params, many) in enumerate(pending):
+            try:
+                await self.write([(sql, params, many)], users=users)
+            except REJECTED as e:
+                logger.error(f"Dropping profile change that can't be written ({e}): {' '.join(sql.split())} {params}")
+            except BaseException:
+                self._pending[:0] = pending[index:]
+                self._pending_users |= users
+                raise
+        return await self.write([], then, users) if then else 0
+
+    async def write(self, statements, then=None, users=()):
+        """Runs [(sql, params, many)] and then the optional (sql, params) statement in one transaction.
+
+        Returns the last statement's row count. users are the profiles changed, whose cached copies other
+        processes sharing the writer have to drop.
+        """
+        if self.writer is not None:
+            return await self.writer.write(statements, then, users)
+        rowcount = 0
+        async with self.transaction() as db:
+            for sql, params, many in statements:
+                await self._run(db, sql, params, many)
+            if then:
+                rowcount = (await self._run(db, *then)).rowcount
+        return rowcount
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error writing queued profile changes: {e}")
+
+    # PROFILE QUERIES
+    async def create_profile(self, user_id, name, role, guild_id=None):
+        # Replacing a profile cascades to its stats, items and scores, so a recreated muse starts fresh
+        self._queue(user_id, "INSERT OR REPLACE INTO profiles (user_id, name, role, guild_id) VALUES (?, ?, ?, ?)",
+                    (user_id, name, role, guild_id))
+        self._queue(user_id, """
+            INSERT INTO profile_stats (user_id, name, role, stat, value)
+            VALUES (?, ?, ?, ?, 0)
+        """, [(user_id, name, role, stat) for stat in DEFAULT_STATS], many=True)
+        # Which row a (user_id, name) lookup finds can change, so reload rather than guess
+        self._generation += 1  # Loads already in flight may have read the old profile
+        self._profiles.pop((user_id, name))
+        if guild_id is None:
+            self._guild_claimed.pop(user_id)
+        self._lists.pop(user_id)
+        self._item_index.pop((user_id, name))
+        self._active.pop(user_id)  # Replacing the profile row drops it as the active muse
+        names = self._name_index.get(user_id)
+        if names is not None:
+            names.add(name)
+
+    async def list_profiles(self, user_id):
+        """Returns the user's [(name, role)]."""
+        profiles = self._lists.get(user_id)
+        if profiles is None:
+            generation = self._generation
+            await self.flush()
+            rows = await self.fetchall("SELECT name, role FROM profiles WHERE user_id = ?", (user_id,))
+            profiles = self._lists.get(user_id) or [tuple(row) for row in rows]
+            if generation == self._generation:
+                self._lists.put(user_id, profiles)
+        return list(profiles)
+
+    async def profiles_page(self, user_id, after=None, limit=25):
+        """Returns up to limit of the user's [(name, role)], in list order, that come after the after pair.
+        The first page comes from the cached list when there is one.
+        """
+        profiles = self._lists.get(user_id)
+        if after is None and profiles is not None:
+            return sorted(profiles)[:limit]
+        await self._flush_user(user_id)
+        if after is None:
+            rows = await self.fetchall("""
+                SELECT name, role FROM profiles WHERE user_id = ?
+                ORDER BY name, role LIMIT ?
+            """, (user_id, limit))
+        else:
+            rows = await self.fetchall("""
+                SELECT name, role FROM profiles WHERE user_id = ? AND (name, role) > (?, ?)
+                ORDER BY name, role LIMIT ?
+            """, (user_id, *after, limit))
+        return [tuple(row) for row in rows]
+
+    async def delete_profile(self, user_id, name, role):
+        """Deletes the profile. Returns 0 if there was no such profile."""
+        # Commands that run while it's being deleted have to reload it, and will see it gone
+        self._generation += 1  # Nor may loads already in flight cache it again
+        self._profiles.pop((user_id, name))
+        self._lists.pop(user_id)
+        self._name_index.pop(user_id)  # The name may still be used by a muse of the other role
+        self._item_index.pop((user_id, name))
+        self._active.pop(user_id)
+        self._pending_users.add(user_id)
+        # Deleted behind anything queued, so a profile created moments ago is found and nothing is left dangling
+        return await self.flush(then=("DELETE FROM profiles WHERE user_id = ? AND name = ? AND role = ?",
+                                      (user_id, name, role)))
+
+    async def complete_profile_names(self, user_id, prefix, limit=25):
+        """Returns up to limit of the user's profile names starting with prefix. Served from memory after
+        the first call for a user, so it's cheap enough to run on every keystroke.
+        """
+        names = self._name_index.get(user_id)
+        if names is None:
+            names = PrefixIndex(name for name, _ in await self.list_profiles(user_id))
+            names = self._name_index.get(user_id) or names  # Kept in sync while this one was loading
+            self._name_index.put(user_id, names)
+        return names.search(prefix, limit)
+
+    async def complete_items(self, user_id, name, prefix, limit=25):
+        """Returns up to limit items in the muse's inventory starting with prefix, like complete_profile_names."""
+        key = (user_id, name)
+        items = self._item_index.get(key)
+        if items is None:
+            profile = await self._load_profile(user_id, name)
+            if not profile:
+                return []
+            items = self._item_index.get(key) or PrefixIndex(profile.inventory)
+            self._item_index.put(key, items)
+        return items.search(prefix, limit)
+
+    async def get_profile(self, user_id, name):
+        """Returns a copy of the muse's Profile, or None if the user has no muse with that name."""
+        profile = await self._load_profile(user_id, name)
+        return profile.copy() if profile else None
+
+    async def _load_profile(self, user_id, name):
+        """Returns the cached Profile, reading it from the database on a miss."""
+        key = (user_id, name)
+        profile = self._profiles.get(key)
+        if profile:
+            return profile
+
+        # Anything queued must be on disk before the database can be read from
+        generation = self._generation
+        await self.flush()
+        row = await self.fetchone("SELECT role, guild_id FROM profiles WHERE user_id = ? AND name = ?", (user_id, name))
+        if not row:
+            return None
+        role, guild_id = row
+        stats = await self.fetchall("""
+            SELECT stat, value FROM profile_stats
+            WHERE user_id = ? AND name = ? AND role = ?
+            ORDER BY rowid
+        """, (user_id, name, role))
+        inventory = await self.fetchall("""
+            SELECT item, count FROM inventory_items
+            WHERE user_id = ? AND name = ? AND role = ?
+            ORDER BY rowid
+        """, (user_id, name, role))
+
+        # Another command may have loaded and changed it while this one was reading
+        profile = self._profiles.get(key) or Profile(user_id, name, role, dict(stats), dict(inventory), guild_id)
+        if generation == self._generation:
+            self._profiles.put(key, profile)
+        return profile
+
+    async def inventory_page(self, user_id, name, role, after=None, limit=25):
+        """Returns up to limit [(item, count)] of the muse's inventory, in the order items were added, that
+        come after the item after. Pass the last item of a page to get the next one; nothing follows an item
+        that has since been removed. The first page comes from the cached profile when there is one.
+        """
+        profile = self._profiles.get((user_id, name))
+        if after is None and profile and profile.role == role:
+            return list(itertools.islice(profile.inventory.items(), limit))
+        await self._flush_user(user_id)
+        if after is None:
+            rows = await self.fetchall("""
+                SELECT item, count FROM inventory_items
+                WHERE user_id = ? AND name = ? AND role = ?
+                ORDER BY rowid LIMIT ?
+            """, (user_id, name, role, limit))
+        else:
+            rows = await self.fetchall("""
+                SELECT item, count FROM inventory_items
+                WHERE user_id = ? AND name = ? AND role = ? AND rowid > (
+                    SELECT rowid FROM inventory_items WHERE user_id = ? AND name = ? AND role = ? AND item = ?
+                )
+                ORDER BY rowid LIMIT ?
+            """, (user_id, name, role, user_id, name, role, after, limit))
+        return [tuple(row) for row in rows]
+
+    async def set_stats(self, user_id, name, stats):
+        """Overwrites the given {stat: value} pairs. Returns 0 if the muse doesn't exist.
+
+        Raises ValueError, changing nothing, if a value doesn't fit in the database.
+        """
+        for stat, value in stats.items():
+            _check_integer(stat, value)
+        profile = await self._load_profile(user_id, name)
+        if not profile:
+            return 0
+        profile.stats.update(stats)
+        self._queue(user_id, """
+            INSERT INTO profile_stats (user_id, name, role, stat, value)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, name, role, stat) DO UPDATE SET value = excluded.value
+        """, [(user_id, name, profile.role, stat, value) for stat, value in stats.items()], many=True)
+        self._score(profile, [(stat.lower(), value) for stat, value in stats.items()], replace=True)
+        return len(stats)
+
+    async def add_item(self, user_id, name, item, count=1):
+        """Adds count of item to the muse's inventory. Returns 0 if the muse doesn't exist."""
+        profile = await self._load_profile(user_id, name)
+        if not profile:
+            return 0
+        profile.inventory[item] = profile.inventory.get(item, 0) + count
+        items = self._item_index.get((user_id, name))
+        if items is not None:
+            items.add(item)
+        self._queue(user_id, """
+            INSERT INTO inventory_items (user_id, name, role, item, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, name, role, item) DO UPDATE SET count = count + excluded.count
+        """, (user_id, name, profile.role, item, count))
+        self._score(profile, [(ITEMS_BOARD, count)])
+        return 1
+
+    async def add_items(self, user_id, name, counts):
+        """Adds {item: count} to the muse's inventory with one statement. Returns 0 if the muse doesn't exist."""
+        profile = await self._load_profile(user_id, name)
+        if not profile:
+            return 0
+        items = self._item_index.get((user_id, name))
+        for item, count in counts.items():
+            profile.inventory[item] = profile.inventory.get(item, 0) + count
+            if items is not None:
+                items.add(item)
+        self._queue(user_id, """
+            INSERT INTO inventory_items (user_id, name, role, item, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, name, role, item) DO UPDATE SET count = count + excluded.count
+        """, [(user_id, name, profile.role, item, count) for item, count in counts.items()], many=True)
+        self._score(profile, [(ITEMS_BOARD, sum(counts.values()))])
+        return len(counts)
+
+    async def remove_item(self, user_id, name, item):
+        """Removes one item from the muse's inventory. Returns 0 if the muse doesn't hold it."""
+        profile = await self._load_profile(user_id, name)
+        if not profile or item not in profile.inventory:
+            return 0
+        if profile.inventory[item] > 1:
+            profile.inventory[item] -= 1
+        else:
+            del profile.inventory[item]
+            items = self._item_index.get((user_id, name))
+            if items is not None:
+                items.remove(item)
+        # Decided by the row, not the cached count, which another process may have changed since. The
+        # delete goes first so a row the update takes down to 1 isn't then deleted too
+        key = (user_id, name, profile.role, item)
+        self._queue(user_id, """
+            DELETE FROM inventory_items
+            WHERE user_id = ? AND name = ? AND role = ? AND item = ? AND count <= 1
+        """, key)
+        self._queue(user_id, """
+            UPDATE inventory_items SET count = count - 1
+            WHERE user_id = ? AND name = ? AND role = ? AND item = ? AND count > 1
+        """, key)
+        self._score(profile, [(ITEMS_BOARD, -1)])
+        return 1
+
+    # LEADERBOARDS
+    def _score(self, profile, changes, replace=False):
+        """Queues [(board, amount)] score changes for the muse, alongside the write they come from."""
+        self._queue(profile.user_id, f"""
+            INSERT INTO leaderboard_scores (board, user_id, name, role, guild_id, score)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (board, user_id, name, role) DO UPDATE SET
+                score = {"excluded.score" if replace else "score + excluded.score"}
+        """, [(board, profile.user_id, profile.name, profile.role, profile.guild_id, amount)
+              for board, amount in changes], many=True)
+
+    def claim_guild(self, user_id, guild_id):
+        """Moves the user's profiles that have no guild, made in DMs or before profiles recorded one, onto the
+        guild's leaderboards. Cogs call it when the user runs a command in a guild; after the first call it's
+        a no-op until the user makes another profile without a guild.
+        """
+        if self._guild_claimed.get(user_id):
+            return
+        self._guild_claimed.put(user_id, True)
+        for key in self._profiles.keys():
+            profile = self._profiles.get(key)
+            if key[0] == user_id and profile.guild_id is None:
+                profile.guild_id = guild_id
+        self._queue(user_id, "UPDATE profiles SET guild_id = ? WHERE user_id = ? AND guild_id IS NULL",
+                    (guild_id, user_id))
+        self._queue(user_id, "UPDATE leaderboard_scores SET guild_id = ? WHERE user_id = ? AND guild_id IS NULL",
+                    (guild_id, user_id))
+
+    async def leaderboard(self, board, guild_id=None, limit=10):
+        """Returns the top [(user_id, name, score)] on the board, for the guild or (with None) everywhere.
+
+        Reads the top of an index, and results are cached for LEADERBOARD_TTL seconds.
+        """
+        key = (board, guild_id, limit)
+        cached = self._leaderboards.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        await self.flush()
+        if guild_id is None:
+            rows = await self.fetchall("""
+                SELECT user_id, name, score FROM leaderboard_scores
+                WHERE board = ? AND score > 0
+                ORDER BY score DESC LIMIT ?
+            """, (board, limit))
+        else:
+            rows = await self.fetchall("""
+                SELECT user_id, name, score FROM leaderboard_scores
+                WHERE board = ? AND guild_id = ? AND score > 0
+                ORDER BY score DESC LIMIT ?
+            """, (board, guild_id, limit))
+        rows = [tuple(row) for row in rows]
+        self._leaderboards.put(key, (time.monotonic() + LEADERBOARD_TTL, rows))
+        return rows
+
+    # ACTIVE MUSE
+    async def set_active_muse(self, user_id, name):
+        """Makes the muse the one activity loot goes to. Returns 0 if the user has no muse with that name."""
+        profile = await self._load_profile(user_id, name)
+        if not profile:
+            return 0
+        self._active.put(user_id, (name, profile.role))
+        self._queue(user_id, """
+            INSERT INTO active_muses (user_id, name, role) VALUES (?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET name = excluded.name, role = excluded.role
+        """, (user_id, name, profile.role))
+        return 1
+
+    async def clear_active_muse(self, user_id):
+        self._active.put(user_id, NO_ACTIVE_MUSE)
+        self._queue(user_id, "DELETE FROM active_muses WHERE user_id = ?", (user_id,))
+
+    async def get_active_muse(self, user_id):
+        """Returns the name of the user's active muse, or None."""
+        active = self._active.get(user_id)
+        if active is None:
+            generation = self._generation
+            await self.flush()
+            row = await self.fetchone("SELECT name, role FROM active_muses WHERE user_id = ?", (user_id,))
+            active = self._active.get(user_id) or (tuple(row) if row else NO_ACTIVE_MUSE)
+            if generation == self._generation:
+                self._active.put(user_id, active)
+        return active[0] if active is not NO_ACTIVE_MUSE else None
+
+    async def deposit(self, user_id, item, count=1):
+        """Adds count of item to the active muse's inventory. Returns the muse's name, or None if the user
+        has no active muse. Queued with the other profile writes, so it is committed in their transaction.
+        """
+        name = await self.get_active_muse(user_id)
+        if name is None:
+            return None
+        if not await self.add_item(user_id, name, item, count):
+            self._active.put(user_id, NO_ACTIVE_MUSE)  # Deleted since it was chosen
+            return None
+        return name
+
+    async def deposit_many(self, user_id, counts):
+        """Adds {item: count} to the active muse's inventory in one bulk write. Returns the muse's name, or None
+        if the user has no active muse.
+        """
+        name = await self.get_active_muse(user_id)
+        if name is None:
+            return None
+        if not await self.add_items(user_id, name, counts):
+            self._active.put(user_id, NO_ACTIVE_MUSE)  # Deleted since it was chosen
+            return None
+        return name
+
+    # ENCOUNTER QUERIES
+    async def load_encounter_sessions(self, now):
+        """Drops expired encounter sessions and returns the rest as [(key, EncounterSession)]."""
+        await self.write([("DELETE FROM encounter_sessions WHERE expires_at <= ?", (now,), False)])
+        rows = await self.fetchall("""
+            SELECT guild_id, channel_id, user_id, beast, failed_attempts, engaged, message_id, expires_at
+            FROM encounter_sessions
+        """)
+        return [(tuple(row[:3]), EncounterSession(row[3], row[4], bool(row[5]), row[6], row[7])) for row in rows]
+
+    async def save_encounter_sessions(self, sessions, ended):
+        """Upserts [(guild_id, channel_id, user_id, session)] and deletes the ended keys in one transaction."""
+        await self.write([
+            ("""
+                INSERT OR REPLACE INTO encounter_sessions
+                    (guild_id, channel_id, user_id, beast, failed_attempts, engaged, message_id, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(guild_id, channel_id, user_id, session.beast, session.failed_attempts, int(session.engaged),
+                   session.message_id, session.expires_at)
+                  for guild_id, channel_id, user_id, session in sessions], True),
+            ("DELETE FROM encounter_sessions WHERE guild_id = ? AND channel_id = ? AND user_id = ?", ended, True),
+        ])
+
+
+# Shared store used by the bot
+store = ProfileStore()
@@ -0,0 +1,143 @@
+"""Monte Carlo simulator for the activity loot tables and the encounter fight rules.
+
+Draws from every table in batches and plays out fights with the same rules the bot uses, then prints
+the simulated rates next to the exact ones so the tables can be tuned with data.
+
+    python -m dbdbot.simulate --draws 1000000 --fights 1000000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from fractions import Fraction
+
+from . import loot
+from .encounters import BEAST_FLED, INJURED, KILLED, SURVIVAL_THRESHOLD, WON, resolve_round
+
+ACTIVITIES = ("hunting", "scavenging", "fishing", "foraging", "locations", "encounters")
+
+# Final outcome of an encounter the player chose to fight
+FLED_INJURED = "fled_injured"
+FIGHT_OUTCOMES = (WON, BEAST_FLED, FLED_INJURED, KILLED)
+
+D20 = range(1, 21)
+
+
+# LOOT
+def simulate_table(table, draws, rng):
+    """Returns a Counter of draws outcomes, sampled in one batch."""
+    return Counter(table.draw_many(draws, rng))
+
+
+def is_blighted(outcome):
+    return outcome.lower().startswith("blighted ")
+
+
+def report_table(name, table, counts, draws, top):
+    print(f"\n== {name} ({len(table)} outcomes, {draws:,} draws) ==")
+    print(f"{'outcome':<40} {'simulated':>10} {'exact':>10} {'error':>8}")
+    rows = sorted(table.entries, key=lambda entry: entry[1], reverse=True)
+    for outcome, weight in rows[:top] if top else rows:
+        simulated = counts[outcome] / draws
+        exact = weight / table.total
+        print(f"{outcome:<40} {simulated:>10.4%} {exact:>10.4%} {simulated - exact:>+8.4%}")
+    if top and len(rows) > top:
+        print(f"... {len(rows) - top} more")
+
+    blighted_weight = sum(weight for outcome, weight in table.entries if is_blighted(outcome))
+    if blighted_weight:
+        simulated = sum(count for outcome, count in counts.items() if is_blighted(outcome)) / draws
+        print(f"{'blighted':<40} {simulated:>10.4%} {blighted_weight / table.total:>10.4%} "
+              f"{simulated - blighted_weight / table.total:>+8.4%}")
+
+
+# FIGHTS
+def simulate_fights(fights, rng, flee_when_injured=False):
+    """Plays out fights encounters round by round; every round's dice are drawn in one batch."""
+    outcomes = Counter()
+    failed = [0] * fights
+    while failed:
+        count = len(failed)
+        rolls = rng.choices(D20, k=count)
+        beast_rolls = rng.choices(D20, k=count)
+        thresholds = rng.choices(range(SURVIVAL_THRESHOLD[0], SURVIVAL_THRESHOLD[1] + 1), k=count)
+        still_fighting = []
+        for roll, beast_roll, threshold, failed_attempts in zip(rolls, beast_rolls, thresholds, failed):
+            outcome, failed_attempts = resolve_round(roll, beast_roll, threshold, failed_attempts)
+            if outcome != INJURED:
+                outcomes[outcome] += 1
+            elif flee_when_injured:
+                outcomes[FLED_INJURED] += 1
+            else:
+                still_fighting.append(failed_attempts)
+        failed = still_fighting
+    return outcomes
+
+
+def exact_fight_odds(flee_when_injured=False):
+    """Enumerates every roll of one round and chains the rounds together; returns exact probabilities."""
+    low, high = SURVIVAL_THRESHOLD
+    rounds = {}
+    for failed_attempts in (0, 1):
+        odds = Counter()
+        for roll in D20:
+            for beast_roll in D20:
+                for threshold in range(low, high + 1):
+                    outcome, _ = resolve_round(roll, beast_roll, threshold, failed_attempts)
+                    odds[outcome] += Fraction(1, 20 * 20 * (high - low + 1))
+        rounds[failed_attempts] = odds
+
+    first, second = rounds[0], rounds[1]
+    if flee_when_injured:
+        return {WON: first[WON], BEAST_FLED: first[BEAST_FLED], FLED_INJURED: first[INJURED], KILLED: Fraction(0)}
+    return {
+        WON: first[WON] + first[INJURED] * second[WON],
+        BEAST_FLED: first[BEAST_FLED] + first[INJURED] * second[BEAST_FLED],
+        FLED_INJURED: Fraction(0),
+        KILLED: first[INJURED] * second[KILLED],
+    }
+
+
+def report_fights(outcomes, fights, flee_when_injured):
+    strategy = "flee once injured" if flee_when_injured else "fight to the end"
+    print(f"\n== fights ({fights:,} encounters, {strategy}) ==")
+    print(f"{'outcome':<40} {'simulated':>10} {'exact':>10} {'error':>8}")
+    exact = exact_fight_odds(flee_when_injured)
+    for outcome in FIGHT_OUTCOMES:
+        simulated = outcomes[outcome] / fights
+        print(f"{outcome:<40} {simulated:>10.4%} {float(exact[outcome]):>10.4%} "
+              f"{simulated - float(exact[outcome]):>+8.4%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--draws", type=int, default=1_000_000, help="draws per loot table")
+    parser.add_argument("--fights", type=int, default=1_000_000, help="encounters to fight")
+    parser.add_argument("--seed", type=int, help="seed the RNG for reproducible runs")
+    parser.add_argument("--flee-when-injured", action="store_true", help="flee instead of fighting on after an injury")
+    parser.add_argument("--top", type=int, default=15, help="outcomes listed per table (0 lists all)")
+    parser.add_argument("--path", default=loot.LOOT_TABLES_PATH, help="loot table data file")
+    parser.add_argument("tables", nargs="*", metavar="table",
+                        help=f"tables to simulate (default: all of {', '.join(ACTIVITIES)})")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.tables if name not in ACTIVITIES]
+    if unknown:
+        parser.error(f"unknown table: {', '.join(unknown)}")
+
+    rng = random.Random(args.seed)
+    loot.load_tables(args.path)
+    start = time.perf_counter()
+
+    for name in args.tables or ACTIVITIES:
+        table = loot.table(name)
+        report_table(name, table, simulate_table(table, args.draws, rng), args.draws, args.top)
+
+    if args.fights:
+        outcomes = simulate_fights(args.fights, rng, args.flee_when_injured)
+        report_fights(outcomes, args.fights, args.flee_when_injured)
+
+    print(f"\nFinished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
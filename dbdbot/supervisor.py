@@ -0,0 +1,151 @@
+"""Runs the bot as several worker processes, each connected to its own range of shards.
+
+    python -m dbdbot.supervisor --workers 4
+
+A single process handles every guild on one event loop, so it's limited to one core however many guilds
+there are. The supervisor splits the shards between workers (python -m dbdbot with DBDBOT_SHARD_IDS and
+DBDBOT_SHARD_COUNT set) and restarts any that crash. It owns the only write connection to the profile
+database; workers read it directly and send their writes to it over a Unix socket (see dbdbot.writer).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+import discord
+
+from .bot import load_token
+from .cogs.metrics import METRICS_PORT_ENV
+from .profile_store import DB_PATH, ProfileStore
+from .writer import WriterServer
+
+logger = logging.getLogger(__name__)
+
+# Discord allows one IDENTIFY every 5 seconds per max_concurrency bucket, across every process of the bot
+IDENTIFY_INTERVAL = 5.0
+
+# How long a crashed worker waits before it is started again
+RESTART_DELAY = 5.0
+
+# How long workers get to write their queued changes and disconnect before they are killed
+SHUTDOWN_TIMEOUT = 30.0
+
+# Where the writer listens unless DBDBOT_WRITER or --writer says otherwise. Fixed rather than per run, so workers
+# reconnecting after a supervisor restart find the new one
+WRITER_PATH = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "dbdbot-writer.sock")
+
+
+async def recommended_shards(token):
+    """Returns (shard count, max_concurrency) as recommended by Discord for the bot."""
+    client = discord.Client(intents=discord.Intents.none())
+    try:
+        await client.login(token)
+        shards, _, limits = await client.http.get_bot_gateway()
+    finally:
+        await client.close()
+    return shards, limits["max_concurrency"]
+
+
+def shard_ranges(shard_count, workers):
+    """Splits the shards into at most `workers` contiguous, evenly sized ranges."""
+    workers = max(1, min(workers, shard_count))
+    return [range(shard_count * i // workers, shard_count * (i + 1) // workers) for i in range(workers)]
+
+
+async def run_worker(index, shards, shard_count, writer_path, delay):
+    """Starts a worker for the shards after delay seconds and restarts it whenever it crashes."""
+    shard_ids = f"{shards.start}-{shards.stop - 1}"
+    label = f"shards {shard_ids}" if len(shards) > 1 else f"shard {shards.start}"
+    env = {
+        **os.environ,
+        "DBDBOT_SHARD_IDS": shard_ids,
+        "DBDBOT_SHARD_COUNT": str(shard_count),
+        "DBDBOT_WRITER": writer_path,
+    }
+    if os.getenv(METRICS_PORT_ENV):
+        # Each worker serves its own metrics, on the configured port plus its index
+        env[METRICS_PORT_ENV] = str(int(os.environ[METRICS_PORT_ENV]) + index)
+    await asyncio.sleep(delay)
+    while True:
+        # In its own session, so a Ctrl-C reaches only the supervisor and workers are stopped in order
+        process = await asyncio.create_subprocess_exec(sys.executable, "-m", __package__, env=env,
+                                                       start_new_session=True)
+        logger.info(f"Started worker {process.pid} for {label}")
+        try:
+            code = await process.wait()
+        except asyncio.CancelledError:
+            await stop_worker(process, label)
+            raise
+        if code == 0:
+            logger.info(f"Worker for {label} exited")
+            return
+        logger.error(f"Worker for {label} exited with status {code}; restarting in {RESTART_DELAY:.0f}s")
+        await asyncio.sleep(RESTART_DELAY)
+
+
+async def stop_worker(process, label):
+    if process.returncode is not None:
+        return
+    process.send_signal(signal.SIGINT)  # Shuts the bot down like a Ctrl-C, writing queued profile changes
+    try:
+        await asyncio.wait_for(process.wait(), SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error(f"Worker for {label} didn't stop within {SHUTDOWN_TIMEOUT:.0f}s; killing it")
+        process.kill()
+        await process.wait()
+
+
+async def supervise(workers, shard_count=None, max_concurrency=1, writer_path=WRITER_PATH):
+    token = load_token()
+    if not token:
+        return
+    if shard_count is None:
+        shard_count, max_concurrency = await recommended_shards(token)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    # Creates the schema and applies migrations before any worker opens the database
+    writer_store = ProfileStore(size=1)
+    await writer_store.open()
+    server = WriterServer(writer_store, writer_path)
+    await server.start()
+
+    ranges = shard_ranges(shard_count, workers)
+    logger.info(f"Running {shard_count} shards in {len(ranges)} workers")
+    tasks = []
+    delay = 0.0
+    for index, shards in enumerate(ranges):
+        tasks.append(asyncio.create_task(run_worker(index, shards, shard_count, server.path, delay)))
+        # Each worker identifies its shards one after another; the next waits its turn
+        delay += IDENTIFY_INTERVAL * len(shards) / max_concurrency
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Workers write their queued changes through the server while stopping, so it closes last
+        await server.close()
+        await writer_store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DBDBOT_WORKERS", os.cpu_count() or 1)),
+                        help="worker processes to run (default: DBDBOT_WORKERS or the number of cores)")
+    parser.add_argument("--shards", type=int, help="total shard count (default: Discord's recommendation)")
+    parser.add_argument("--writer", default=os.getenv("DBDBOT_WRITER", WRITER_PATH),
+                        help="socket the profile writer listens on (default: DBDBOT_WRITER or next to the database)")
+    args = parser.parse_args()
+    if args.workers < 1 or (args.shards is not None and args.shards < 1):
+        parser.error("--workers and --shards must be at least 1")
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(supervise(args.workers, args.shards, writer_path=args.writer))
+    except KeyboardInterrupt:
+        logger.info("Supervisor shut down manually.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Funnels the profile writes of several bot processes through one SQLite connection.
+
+SQLite allows a single writer at a time, so when the bot runs as several worker processes (see
+dbdbot.supervisor) only the supervisor commits. Workers keep reading the database file themselves and send
+each batch of queued writes over a Unix socket:
+
+    worker -> writer  {"id": 1, "statements": [[sql, params, many], ...], "then": [sql, params], "users": [...]}
+    writer -> worker  {"id": 1, "rowcount": 0} or {"id": 1, "error": "...", "rejected": true}
+    writer -> others  {"invalidate": [user ids]}
+
+Once a batch is committed, every other worker is told which users it changed so they drop their cached copies.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+
+from .profile_store import REJECTED, WriteRejected
+
+logger = logging.getLogger(__name__)
+
+# Longest message either side accepts; a flush is at most FLUSH_MAX_WRITES statements, most of them small
+MAX_MESSAGE = 16 * 1024 * 1024
+
+
+class WriterError(RuntimeError):
+    """A batch the writer process couldn't commit, or the writer being unreachable."""
+
+
+def _encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class WriterServer:
+    """Commits the batches sent by worker processes with store.write(), one at a time."""
+
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+        self._server = None
+        self._clients = set()
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left behind by a supervisor that didn't shut down cleanly
+        self._server = await asyncio.start_unix_server(self._serve, self.path, limit=MAX_MESSAGE)
+        logger.info(f"Profile writer listening on {self.path}")
+
+    async def close(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for client in list(self._clients):
+            client.close()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve(self, reader, writer):
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                try:
+                    async with self._lock:
+                        rowcount = await self.store.write(request["statements"], request.get("then"))
+                except Exception as e:
+                    logger.error(f"Error writing a worker's profile changes: {e}")
+                    reply = {"id": request["id"], "error": str(e), "rejected": isinstance(e, REJECTED)}
+                    writer.write(_encode(reply))
+                else:
+                    writer.write(_encode({"id": request["id"], "rowcount": rowcount}))
+                    if request.get("users"):
+                        self._broadcast(writer, request["users"])
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Dropping profile writer client: {e}")
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    def _broadcast(self, origin, users):
+        message = _encode({"invalidate": users})
+        for client in self._clients:
+            if client is not origin and not client.is_closing():
+                client.write(message)
+
+
+class WriterClient:
+    """Sends a worker's writes to the WriterServer and applies the invalidations it broadcasts.
+
+    Connects on first use and again after the connection is lost, so a restarted supervisor is picked up.
+    Invalidations broadcast while it was disconnected are lost, so on_reconnect() is called to drop everything
+    cached instead.
+    """
+
+    def __init__(self, path, on_invalidate, on_reconnect=None):
+        self.path = path
+        self.on_invalidate = on_invalidate
+        self.on_reconnect = on_reconnect
+        self._connected_before = False
+        self._reader = None
+        self._writer = None
+        self._listener = None
+        self._ids = itertools.count(1)
+        self._replies = {}  # id -> future resolved with the row count
+        self._connect_lock = asyncio.Lock()
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MAX_MESSAGE)
+            self._listener = asyncio.create_task(self._listen(self._reader))
+            logger.info(f"Connected to profile writer {self.path}")
+            if self._connected_before and self.on_reconnect is not None:
+                self.on_reconnect()
+            self._connected_before = True
+
+    async def write(self, statements, then=None, users=()):
+        """Has the writer commit the batch; see ProfileStore.write.
+
+        Raises WriteRejected if a statement can't be written, and WriterError if the writer couldn't be reached.
+        """
+        try:
+            await self._ensure_connected()
+        except OSError as e:
+            raise WriterError(f"Profile writer unreachable: {e}") from e
+        request_id = next(self._ids)
+        future = self._replies[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            self._writer.write(_encode({"id": request_id, "statements": statements, "then": then,
+                                        "users": list(users)}))
+            await self._writer.drain()
+            return await future
+        except ConnectionError as e:
+            raise WriterError(f"Lost the profile writer: {e}") from e
+        finally:
+            self._replies.pop(request_id, None)
+
+    async def _listen(self, reader):
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "invalidate" in message:
+                    self.on_invalidate(message["invalidate"])
+                    continue
+                future = self._replies.get(message["id"])
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    # Rejected statements are dropped by the store; anything else is kept for another attempt
+                    error = WriteRejected if message.get("rejected") else WriterError
+                    future.set_exception(error(message["error"]))
+                else:
+                    future.set_result(message["rowcount"])
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Profile writer connection failed: {e}")
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            # The store queues these batches again. One the writer committed just before the connection dropped
+            # is then applied twice, which only happens if the supervisor dies mid-reply
+            for future in self._replies.values():
+                if not future.done():
+                    future.set_exception(WriterError("Lost the profile writer"))
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._writer = self._listener = None
@@ -1,21 +1,12 @@
-
-import sqlite3
-import aiosqlite
+# Creates or migrates profiles.db without starting the bot
 import asyncio
 
+from dbdbot.profile_store import store
+
+
 async def initialize_db():
-    async with aiosqlite.connect('profiles.db') as db:
-        await db.execute('''
-        CREATE TABLE IF NOT EXISTS profiles (
-            user_id INTEGER,
-            name TEXT,
-            role TEXT,
-            stats TEXT,
-            inventory TEXT,
-            PRIMARY KEY (user_id, name, role)
-        )
-        ''')
-        await db.commit()
+    await store.open()
+    await store.close()
 
 if __name__ == "__main__":
     asyncio.run(initialize_db())
@@ -0,0 +1,53 @@
+"""Shutting down while a background flush is writing must not lose the changes it was writing."""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from dbdbot.encounters import EncounterStore
+from dbdbot.profile_store import ProfileStore
+
+
+def slowed(write, delay=0.2):
+    async def slow_write(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return await write(*args, **kwargs)
+    return slow_write
+
+
+class CloseDuringFlush(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "profiles.db")
+
+    def count(self, table):
+        db = sqlite3.connect(self.path)
+        try:
+            return db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        finally:
+            db.close()
+
+    async def test_profile_store(self):
+        store = ProfileStore(self.path, flush_interval=0.01)
+        await store.open()
+        store.write = slowed(store.write)
+        await store.create_profile(1, "Meg", "Survivor")
+        await asyncio.sleep(0.05)  # The periodic flush has taken the batch and is writing it
+        await store.close()
+        self.assertEqual(self.count("profiles"), 1)
+
+    async def test_encounter_store(self):
+        store = ProfileStore(self.path)
+        await store.open()
+        sessions = EncounterStore()
+        await sessions.open(store, interval=0.01)
+        store.save_encounter_sessions = slowed(store.save_encounter_sessions)
+        sessions.start((1, 2, 3), "Wolf")
+        await asyncio.sleep(0.05)
+        await sessions.close()
+        await store.close()
+        self.assertEqual(self.count("encounter_sessions"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()